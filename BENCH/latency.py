@@ -0,0 +1,351 @@
+# BENCH/latency.py
+# End-to-end latencies as a user sees them, with MatrixClient talking HTTP to
+# the stand-in homeserver (BENCH/stand_in_server.py):
+#
+#   login -> first sidebar, room switch -> first message, send -> echo.
+#
+#   python -m BENCH.latency
+#   python -m BENCH.latency --runs 20 --rooms 1000 --delay 30
+#   python -m BENCH.latency --gui                  # until MainWindow has painted it (offscreen)
+#   python -m BENCH.latency --server http://127.0.0.1:8008
+#
+# Without --server the stand-in runs in a background thread of this process.
+# The session store is pointed at a temporary directory for the run.
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+
+from BENCH.run import percentile
+from BENCH.stand_in_server import PASSWORD, ServerThread, StandInHomeserver
+from BENCH.synthetic import SyntheticAccount, temporary_session_store
+from CORE.matrix_client import MatrixClient
+from UTILS.open_room_manager import OpenRoomManager
+from UTILS.timeline_manager import TimelineManager
+
+# The order of the report.
+METRICS = [
+    ("login", "login request answered"),
+    ("first_sync", "first sync applied"),
+    ("first_sidebar", "first rooms in the sidebar"),
+    ("full_sidebar", "complete room list in the sidebar"),
+    ("room_switch", "room switch to messages shown (buffered)"),
+    ("room_switch_history", "room switch to messages shown (fetched)"),
+    ("send_ack", "send answered by the server"),
+    ("echo", "sent message shown from sync"),
+]
+
+class Probe:
+    """
+    Times conditions on what the user sees. Conditions are checked each
+    time the screen may have changed: on every client event, or on every
+    paint when the real window is used.
+    """
+
+    def __init__(self):
+        self._waiting = []
+
+    def check(self, *_):
+        now = time.perf_counter()
+        for waiting in list(self._waiting):
+            condition, future = waiting
+            if future.done():
+                self._waiting.remove(waiting)
+            elif condition():
+                future.set_result(now)
+                self._waiting.remove(waiting)
+
+    async def wait(self, condition, timeout: float) -> float:
+        """The perf_counter time at which 'condition' was first seen true."""
+        if condition():
+            return time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.append((condition, future))
+        return await asyncio.wait_for(future, timeout)
+
+class EventScreen:
+    """What the user would see, rebuilt from the client's events (no GUI)."""
+
+    def __init__(self, client: MatrixClient, probe: Probe):
+        self.client = client
+        self.rooms = {}
+        self.room_list_done = False
+        self.room_id = None
+        self.bodies = []
+
+        events = client.events
+        events.rooms.connect(self.on_rooms)
+        events.room_patch.connect(self.on_room_patch)
+        events.message.connect(self.on_message)
+        events.timeline_reset.connect(self.on_timeline_reset)
+        events.timeline.connect(self.on_timeline)
+        for event in (events.rooms, events.room_patch, events.message, events.timeline_reset, events.timeline):
+            event.connect(probe.check)
+
+    def on_rooms(self, room_details: list):
+        self.rooms = {room["room_id"]: room for room in room_details}
+
+    def on_room_patch(self, patch: dict):
+        for room in patch["upsert"]:
+            self.rooms[room["room_id"]] = room
+        for room_id in patch["remove"]:
+            self.rooms.pop(room_id, None)
+
+    def on_message(self, text: str, role: str = None):
+        # Sent once a room list refresh has published its final list.
+        if text.startswith("Fetched ") and role == "system":
+            self.room_list_done = True
+
+    def on_timeline_reset(self, room_id: str, events: list, prev_batch):
+        if room_id == OpenRoomManager.get_current_room():
+            self.room_id = room_id
+            self.bodies = [getattr(event, "body", None) for event in events]
+
+    def on_timeline(self, room_id: str, events: list):
+        if room_id == self.room_id:
+            self.bodies.extend(getattr(event, "body", None) for event in events)
+
+    def sidebar_shown(self) -> bool:
+        return bool(self.rooms)
+
+    def room_shown(self, room_id: str) -> bool:
+        return self.room_id == room_id and bool(self.bodies)
+
+    def body_shown(self, body: str) -> bool:
+        return body in self.bodies[-20:]
+
+class WindowScreen(EventScreen):
+    """
+    What MainWindow shows: conditions are checked on the models behind the
+    sidebar and the timeline, at the moment those views paint.
+    """
+
+    def __init__(self, client: MatrixClient, probe: Probe, window):
+        super().__init__(client, probe)
+        self.window = window
+        for event in (client.events.rooms, client.events.room_patch, client.events.message,
+                      client.events.timeline_reset, client.events.timeline):
+            event.disconnect(probe.check)
+        self.watchers = [
+            watch_paints(window.tree.viewport(), probe.check),
+            watch_paints(window.timeline_view.viewport(), probe.check),
+        ]
+
+    def close(self):
+        for watcher in self.watchers:
+            watcher.parent().removeEventFilter(watcher)
+            watcher.deleteLater()
+
+    def sidebar_shown(self) -> bool:
+        return self.window.room_model.rowCount() > 0
+
+    def room_shown(self, room_id: str) -> bool:
+        model = self.window.timeline_model
+        return model.room_id == room_id and model.rowCount() > 0 and self.window.timeline_view.isVisible()
+
+    def body_shown(self, body: str) -> bool:
+        return any(getattr(event, "body", None) == body for event in self.window.timeline_model.events[-20:])
+
+def watch_paints(widget, callback):
+    """Calls 'callback' whenever 'widget' is painted."""
+    from PySide6.QtCore import QEvent, QObject
+
+    class PaintWatcher(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                callback()
+            return False
+
+    watcher = PaintWatcher(widget)
+    widget.installEventFilter(watcher)
+    return watcher
+
+async def wait_polled(condition, timeout: float, interval: float = 0.001) -> float:
+    """For state no event reports; accurate to about 'interval'."""
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise asyncio.TimeoutError()
+        await asyncio.sleep(interval)
+    return time.perf_counter()
+
+def clear_directory(path: str):
+    for name in os.listdir(path):
+        full_path = os.path.join(path, name)
+        if os.path.isfile(full_path):
+            os.remove(full_path)
+
+async def measure_run(url: str, args, samples: dict, store_dir: str, window=None):
+    """One login, room switches and sends, then a logout."""
+    client = MatrixClient()
+    client.homeserver = url
+    probe = Probe()
+    if window is None:
+        screen = EventScreen(client, probe)
+    else:
+        from CORE.qt_bridge import bridge_client_events
+        from UTILS.signals import SignalManager
+        bridge_client_events(client.events, SignalManager())
+        window.matrix_client = client
+        screen = WindowScreen(client, probe, window)
+
+    timeout = args.timeout
+    started = time.perf_counter()
+    waits = {
+        "first_sync": asyncio.ensure_future(wait_polled(lambda: client.next_batch is not None, timeout)),
+        "first_sidebar": asyncio.ensure_future(probe.wait(screen.sidebar_shown, timeout)),
+        "full_sidebar": asyncio.ensure_future(probe.wait(lambda: screen.room_list_done, timeout)),
+    }
+    if not await client.login(args.username, PASSWORD):
+        raise RuntimeError(f"Could not log in to {url}.")
+    samples["login"].append(time.perf_counter() - started)
+    for name, wait in waits.items():
+        samples[name].append(await wait - started)
+
+    rooms = [room_id for room_id, room in client.published_rooms.items()
+             if room.get("joined") and not room.get("is_space")]
+    for i in range(args.switches):
+        for name in ("room_switch", "room_switch_history"):
+            # A different room every time, never the one already open.
+            switches = len(samples["room_switch"]) + len(samples["room_switch_history"])
+            room_id = rooms[switches % len(rooms)]
+            if room_id == OpenRoomManager.get_current_room():
+                room_id = rooms[(switches + 1) % len(rooms)]
+            if name == "room_switch_history":
+                TimelineManager.remove(room_id)
+            OpenRoomManager.set_current_room(room_id)
+            started = time.perf_counter()
+            shown = asyncio.ensure_future(probe.wait(lambda: screen.room_shown(room_id), timeout))
+            asyncio.ensure_future(client.open_room(room_id))
+            samples[name].append(await shown - started)
+
+    room_id = OpenRoomManager.get_current_room()
+    for i in range(args.sends):
+        body = f"latency probe {uuid.uuid4().hex}"
+        started = time.perf_counter()
+        echoed = asyncio.ensure_future(probe.wait(lambda: screen.body_shown(body), timeout))
+        if not await client.send_message(room_id, body):
+            raise RuntimeError("Sending a message failed.")
+        samples["send_ack"].append(time.perf_counter() - started)
+        samples["echo"].append(await echoed - started)
+
+    await client.logout()
+    OpenRoomManager.reset_current_room()
+    # The next login starts without any state on disk.
+    clear_directory(store_dir)
+    if window is not None:
+        screen.close()
+
+async def drive(url: str, args, store_dir: str) -> dict:
+    samples = {name: [] for name, _ in METRICS}
+    window = None
+    if args.gui:
+        from UI.main_window import MainWindow
+        window = MainWindow(matrix_client=None)
+        window.show()
+        window.toggle_sidebar()
+
+    try:
+        for run in range(args.runs):
+            await measure_run(url, args, samples, store_dir, window)
+            print(f"Run {run + 1}/{args.runs} done.", flush=True)
+    finally:
+        if window is not None:
+            window.hide()
+    return samples
+
+def summarize(samples: dict) -> list:
+    results = []
+    for name, description in METRICS:
+        values = sorted(samples.get(name, []))
+        if not values:
+            continue
+        results.append({
+            "name": name,
+            "description": description,
+            "count": len(values),
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p90_ms": percentile(values, 0.90) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+            "max_ms": values[-1] * 1000,
+            "mean_ms": sum(values) / len(values) * 1000,
+        })
+    return results
+
+def format_summary(results: list) -> list:
+    lines = [f"{'metric':<22}{'n':>5}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'mean ms':>10}"]
+    for result in results:
+        lines.append(
+            f"{result['name']:<22}{result['count']:>5}{result['p50_ms']:>10.1f}{result['p90_ms']:>10.1f}"
+            f"{result['p99_ms']:>10.1f}{result['max_ms']:>10.1f}{result['mean_ms']:>10.1f}"
+        )
+    return lines
+
+def run_loop(coroutine, gui: bool):
+    """Runs the driver on a plain asyncio loop, or on qasync for --gui."""
+    if not gui:
+        return asyncio.run(coroutine)
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    from qasync import QEventLoop
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    loop = QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    with loop:
+        return loop.run_until_complete(coroutine)
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end latencies against a stand-in homeserver.")
+    parser.add_argument("--server", help="URL of a stand-in started separately (default: start one here)")
+    parser.add_argument("--username", default="bench")
+    parser.add_argument("--runs", type=int, default=5, help="logins to measure (default: 5)")
+    parser.add_argument("--switches", type=int, default=5, help="room switches of each kind per run (default: 5)")
+    parser.add_argument("--sends", type=int, default=5, help="messages sent per run (default: 5)")
+    parser.add_argument("--rooms", type=int, default=200, help="joined rooms (default: 200)")
+    parser.add_argument("--spaces", type=int, default=10, help="joined spaces (default: 10)")
+    parser.add_argument("--state-events", type=int, default=20, help="state events per room (default: 20)")
+    parser.add_argument("--events-per-room", type=int, default=20, help="timeline events per room in the initial sync (default: 20)")
+    parser.add_argument("--body-length", type=int, default=0, help="pad message bodies to this many characters (default: 0)")
+    parser.add_argument("--delay", type=float, default=0.0, help="delay before every response, in ms (default: 0)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for any one step (default: 60)")
+    parser.add_argument("--gui", action="store_true", help="measure until MainWindow has painted the result")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    server = None
+    url = args.server
+    if not url:
+        account = SyntheticAccount(
+            rooms=args.rooms,
+            spaces=args.spaces,
+            state_events=args.state_events,
+            events_per_room=args.events_per_room,
+            body_length=args.body_length,
+        )
+        server = ServerThread(StandInHomeserver(account, delay=args.delay / 1000))
+        url = server.start()
+        print(f"Stand-in homeserver at {url}: {args.rooms} rooms, {args.spaces} spaces, "
+              f"{args.delay:g} ms delay.")
+
+    try:
+        with temporary_session_store() as store_dir:
+            samples = run_loop(drive(url, args, store_dir), args.gui)
+    finally:
+        if server is not None:
+            server.stop()
+
+    results = summarize(samples)
+    print("\n".join(format_summary(results)))
+
+    if args.json:
+        settings = {key: value for key, value in vars(args).items() if key != "json"}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"settings": settings, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
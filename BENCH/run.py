@@ -0,0 +1,309 @@
+# BENCH/run.py
+# Offline benchmarks of the sync, room list and history paths, on synthetic
+# data (BENCH/synthetic.py) instead of a homeserver.
+#
+#   python -m BENCH.run
+#   python -m BENCH.run --rooms 2000 --spaces 50 --state-events 100 --iterations 10
+#   python -m BENCH.run --only sync_initial,populate_sidebar --json before.json
+#   python -m BENCH.run --compare before.json
+#
+# Run from the repository root. The session store is pointed at a temporary
+# directory, so the real STORE/session is never touched.
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import nio
+
+from BENCH.synthetic import HOMESERVER, USER_ID, MockAsyncClient, SyntheticAccount, temporary_session_store
+from CORE.matrix_client import MatrixClient
+from UTILS.room_state_cache import RoomStateCache
+from UTILS.session_store import SessionStore
+from UTILS.space_graph import SpaceGraph
+from UTILS.timeline_manager import TimelineManager
+
+class Benchmark:
+    """
+    One measured path. 'setup' runs untimed before every call; 'call' is
+    the timed coroutine function; 'size' is how many 'unit's one call handles.
+    """
+
+    def __init__(self, name: str, call, size: int, unit: str = "events", setup=None):
+        self.name = name
+        self.call = call
+        self.size = size
+        self.unit = unit
+        self.setup = setup or (lambda: None)
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+async def measure(benchmark: Benchmark, iterations: int, warmup: int = 1) -> dict:
+    """
+    Times 'iterations' calls after 'warmup' untimed ones, then makes one more
+    call under tracemalloc for the peak memory. tracemalloc slows Python
+    down several times over, so it is kept out of the timed calls.
+    """
+    timings = []
+    for i in range(warmup + iterations):
+        benchmark.setup()
+        started = time.perf_counter()
+        await benchmark.call()
+        elapsed = time.perf_counter() - started
+        if i >= warmup:
+            timings.append(elapsed)
+
+    benchmark.setup()
+    tracemalloc.start()
+    try:
+        await benchmark.call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    total = sum(timings)
+    return {
+        "name": benchmark.name,
+        "calls": len(timings),
+        "size": benchmark.size,
+        "unit": benchmark.unit,
+        "p50_ms": percentile(timings, 0.50) * 1000,
+        "p90_ms": percentile(timings, 0.90) * 1000,
+        "p99_ms": percentile(timings, 0.99) * 1000,
+        "max_ms": timings[-1] * 1000,
+        "per_second": benchmark.size * len(timings) / total if total else 0.0,
+        "peak_kib": peak / 1024,
+    }
+
+def reset_client(client: MatrixClient):
+    """Forgets everything the client learned, as after a fresh login."""
+    client.room_refresh.cancel()
+    TimelineManager.clear()
+    RoomStateCache.clear()
+    SpaceGraph.clear()
+    client.published_rooms = {}
+    client.next_batch = None
+    SessionStore.load(USER_ID, HOMESERVER)
+
+def client_benchmarks(client: MatrixClient, account: SyntheticAccount, args) -> list:
+    initial = account.initial_sync()
+    initial_response = nio.SyncResponse.from_dict(initial)
+    initial_events = sum(
+        len(room["state"]["events"]) + len(room["timeline"]["events"])
+        for room in initial["rooms"]["join"].values()
+    )
+    joined = account.joined_room_ids()
+    state_events = sum(len(account.state(room_id)) for room_id in joined)
+
+    async def parse_sync():
+        nio.SyncResponse.from_dict(initial)
+
+    async def sync_initial():
+        await client.process_sync_response(initial_response, None)
+        # A changed room list schedules a refresh; that is measured on its own.
+        client.room_refresh.cancel()
+
+    incremental = {}
+
+    def next_incremental():
+        incremental["response"] = nio.SyncResponse.from_dict(
+            account.incremental_sync(args.sync_events, args.active_rooms)
+        )
+
+    async def sync_incremental():
+        await client.process_sync_response(incremental["response"], "s0")
+        client.room_refresh.cancel()
+
+    async def fetch_rooms():
+        await client.fetch_rooms_and_spaces()
+
+    def uncache_rooms():
+        RoomStateCache.clear()
+        SpaceGraph.clear()
+        client.published_rooms = {}
+
+    history_rooms = {"next": 0}
+
+    def next_history_room():
+        room_id = joined[history_rooms["next"] % len(joined)]
+        history_rooms["next"] += 1
+        TimelineManager.remove(room_id)
+        history_rooms["room_id"] = room_id
+
+    async def fetch_room_messages():
+        await client.fetch_room_messages(history_rooms["room_id"])
+
+    incremental_size = args.sync_events * len(joined[:args.active_rooms])
+    return [
+        Benchmark("parse_sync", parse_sync, initial_events),
+        Benchmark("sync_initial", sync_initial, initial_events, setup=lambda: reset_client(client)),
+        # Starts from the state the initial sync left behind.
+        Benchmark("sync_incremental", sync_incremental, incremental_size, setup=next_incremental),
+        Benchmark("fetch_rooms_cold", fetch_rooms, state_events, setup=uncache_rooms),
+        Benchmark("fetch_rooms_cached", fetch_rooms, len(joined), unit="rooms"),
+        Benchmark("fetch_room_messages", fetch_room_messages, client.timeline_page_size(),
+                  setup=next_history_room),
+    ]
+
+def sidebar_benchmarks(client: MatrixClient) -> list:
+    """
+    The room tree model behind the sidebar, filled the way
+    MainWindow.populate_sidebar fills it, with a view attached.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication, QTreeView
+    from UI.room_tree_model import RoomTreeModel
+
+    app = QApplication.instance() or QApplication([])
+    model = RoomTreeModel()
+    view = QTreeView()
+    view.setHeaderHidden(True)
+    view.setModel(model)
+    view.resize(300, 800)
+    view.show()
+
+    rooms = client._build_room_tree([
+        RoomStateCache.room_details(room_id, USER_ID) for room_id in RoomStateCache.room_ids()
+    ])
+    # Two lists that differ in the names of 1% of the rooms, alternated.
+    renamed = [dict(room, name=room["name"] + " (renamed)") if i % 100 == 0 else room
+               for i, room in enumerate(rooms)]
+    updates = {"next": 0}
+
+    def clear_model():
+        model.set_rooms([])
+        app.processEvents()
+
+    async def populate():
+        model.set_rooms(rooms)
+        app.processEvents()
+
+    async def update():
+        updates["next"] += 1
+        model.set_rooms(renamed if updates["next"] % 2 else rooms)
+        app.processEvents()
+
+    return [
+        Benchmark("populate_sidebar", populate, len(rooms), unit="rooms", setup=clear_model),
+        Benchmark("update_sidebar", update, len(rooms), unit="rooms"),
+    ]
+
+def format_results(results: list) -> list:
+    lines = [
+        f"{'benchmark':<22}{'calls':>6}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+        f"{'throughput':>22}{'peak KiB':>11}"
+    ]
+    for result in results:
+        throughput = f"{result['per_second']:,.0f} {result['unit']}/s"
+        lines.append(
+            f"{result['name']:<22}{result['calls']:>6}{result['p50_ms']:>10.2f}{result['p90_ms']:>10.2f}"
+            f"{result['p99_ms']:>10.2f}{result['max_ms']:>10.2f}{throughput:>22}{result['peak_kib']:>11,.0f}"
+        )
+    return lines
+
+def format_comparison(results: list, baseline: dict) -> list:
+    """p50 and peak memory of each benchmark relative to a saved run."""
+    before = {result["name"]: result for result in baseline.get("results", [])}
+    lines = [f"Compared with {baseline.get('label') or 'baseline'} (p50, peak memory):"]
+    for result in results:
+        old = before.get(result["name"])
+        if not old:
+            continue
+        time_change = (result["p50_ms"] / old["p50_ms"] - 1) * 100 if old["p50_ms"] else 0.0
+        memory_change = (result["peak_kib"] / old["peak_kib"] - 1) * 100 if old["peak_kib"] else 0.0
+        lines.append(f"  {result['name']:<22}{time_change:+8.1f}%{memory_change:+10.1f}%")
+    return lines
+
+async def run(args) -> list:
+    account = SyntheticAccount(
+        rooms=args.rooms,
+        spaces=args.spaces,
+        state_events=args.state_events,
+        events_per_room=args.events_per_room,
+        history=args.history,
+        body_length=args.body_length,
+    )
+    client = MatrixClient()
+    client.client = MockAsyncClient(account, latency=args.latency / 1000)
+
+    selected = set(args.only.split(",")) if args.only else None
+    benchmarks = client_benchmarks(client, account, args)
+    results = []
+
+    reset_client(client)
+    for benchmark in benchmarks:
+        if selected is None or benchmark.name in selected:
+            results.append(await measure(benchmark, args.iterations))
+            print(format_results(results[-1:])[-1], flush=True)
+        if benchmark.name == "sync_initial":
+            # Leave the initial sync applied for the incremental one.
+            reset_client(client)
+            await benchmark.call()
+
+    if not args.no_gui and (selected is None or selected & {"populate_sidebar", "update_sidebar"}):
+        try:
+            gui_benchmarks = sidebar_benchmarks(client)
+        except ImportError as e:
+            print(f"Skipping the sidebar benchmarks: {e}")
+            gui_benchmarks = []
+        for benchmark in gui_benchmarks:
+            if selected is None or benchmark.name in selected:
+                results.append(await measure(benchmark, args.iterations))
+                print(format_results(results[-1:])[-1], flush=True)
+
+    client.room_refresh.cancel()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks of the client's hot paths.")
+    parser.add_argument("--rooms", type=int, default=500, help="joined rooms (default: 500)")
+    parser.add_argument("--spaces", type=int, default=20, help="joined spaces the rooms are spread over (default: 20)")
+    parser.add_argument("--state-events", type=int, default=30, help="state events per room (default: 30)")
+    parser.add_argument("--events-per-room", type=int, default=20, help="timeline events per room in the initial sync (default: 20)")
+    parser.add_argument("--history", type=int, default=1000, help="messages per room available to /messages (default: 1000)")
+    parser.add_argument("--body-length", type=int, default=0, help="pad message bodies to this many characters (default: 0)")
+    parser.add_argument("--sync-events", type=int, default=3, help="new events per room in an incremental sync (default: 3)")
+    parser.add_argument("--active-rooms", type=int, default=None, help="rooms with new events in an incremental sync (default: all)")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated latency per request, in ms (default: 0)")
+    parser.add_argument("--iterations", type=int, default=20, help="timed calls per benchmark (default: 20)")
+    parser.add_argument("--only", help="comma separated benchmark names")
+    parser.add_argument("--no-gui", action="store_true", help="skip the benchmarks that need PySide6")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--label", help="name of this run in the JSON output, e.g. a commit")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    print(f"{args.rooms} rooms, {args.spaces} spaces, {args.state_events} state events and "
+          f"{args.events_per_room} timeline events per room; {args.iterations} calls each.")
+    print(format_results([])[0])
+
+    with temporary_session_store():
+        results = asyncio.run(run(args))
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            print("\n".join(format_comparison(results, json.load(f))))
+
+    if args.json:
+        settings = {key: value for key, value in vars(args).items() if key not in ("json", "compare", "label")}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "label": args.label,
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "settings": settings,
+                "results": results,
+            }, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+# BENCH/stand_in_server.py
+# A local stand-in for a homeserver, serving a SyntheticAccount over HTTP.
+#
+#   python -m BENCH.stand_in_server --port 8008 --rooms 500 --delay 20
+#
+# Point Fastliner at http://127.0.0.1:8008 and log in with any username and
+# the password "bench". Only the endpoints MatrixClient uses are served.
+import argparse
+import asyncio
+import threading
+import time
+
+from aiohttp import web
+
+from BENCH.synthetic import USER_ID, SyntheticAccount, joined_room, sync_body
+
+PASSWORD = "bench"
+ACCESS_TOKEN = "bench-token"
+
+class StandInHomeserver:
+    """
+    Answers the client-server API calls MatrixClient makes: login, logout,
+    whoami, filter upload, sync, joined_rooms, state, messages, send, invite
+    and hierarchy. Every response waits 'delay' seconds first; response sizes
+    follow the account's room count, state size and messages per room.
+
+    Messages sent to a room are delivered to the next sync, which waits for
+    them the way a long-polling /sync does, so send to echo can be timed.
+    """
+
+    def __init__(self, account: SyntheticAccount, delay: float = 0.0):
+        self.account = account
+        self.delay = delay
+        self.requests = {}
+        # Sent events not yet synced: (batch number, room ID, event).
+        self._sent = []
+        self._batch = 0
+        self._new_events = None
+
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.add_routes([
+            web.post("/_matrix/client/v3/login", self.login),
+            web.post("/_matrix/client/v3/logout", self.logout),
+            web.get("/_matrix/client/v3/account/whoami", self.whoami),
+            web.post("/_matrix/client/v3/user/{user_id}/filter", self.upload_filter),
+            web.get("/_matrix/client/v3/sync", self.sync),
+            web.get("/_matrix/client/v3/joined_rooms", self.joined_rooms),
+            web.get("/_matrix/client/v3/rooms/{room_id}/state", self.room_state),
+            web.get("/_matrix/client/v3/rooms/{room_id}/messages", self.room_messages),
+            web.get("/_matrix/client/v3/rooms/{room_id}/context/{event_id}", self.room_context),
+            web.put("/_matrix/client/v3/rooms/{room_id}/send/{event_type}/{txn_id}", self.room_send),
+            web.post("/_matrix/client/v3/rooms/{room_id}/invite", self.room_invite),
+            web.get("/_matrix/client/v1/rooms/{room_id}/hierarchy", self.hierarchy),
+        ])
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else "unknown"
+        self.requests[route] = self.requests.get(route, 0) + 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return await handler(request)
+
+    async def login(self, request):
+        body = await request.json()
+        if body.get("password") != PASSWORD:
+            return web.json_response({"errcode": "M_FORBIDDEN", "error": "Invalid password"}, status=403)
+        return web.json_response({
+            "user_id": USER_ID,
+            "access_token": ACCESS_TOKEN,
+            "device_id": body.get("device_id") or "STANDIN",
+        })
+
+    async def logout(self, request):
+        return web.json_response({})
+
+    async def whoami(self, request):
+        return web.json_response({"user_id": USER_ID, "device_id": "STANDIN"})
+
+    async def upload_filter(self, request):
+        return web.json_response({"filter_id": "1"})
+
+    async def sync(self, request):
+        since = request.query.get("since")
+        if not since:
+            body = self.account.initial_sync()
+            body["next_batch"] = f"s{self._batch}"
+            return web.json_response(body)
+
+        since_batch = int(since[1:]) if since[1:].isdigit() else 0
+        if self._batch <= since_batch:
+            timeout = int(request.query.get("timeout", 0)) / 1000
+            self._new_events = self._new_events or asyncio.Event()
+            try:
+                await asyncio.wait_for(self._new_events.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        join = {}
+        for batch, room_id, event in self._sent:
+            if batch > since_batch:
+                join.setdefault(room_id, joined_room([], [], prev_batch=f"s{since_batch}"))
+                join[room_id]["timeline"]["events"].append(event)
+        return web.json_response(sync_body(join, f"s{self._batch}"))
+
+    async def joined_rooms(self, request):
+        return web.json_response({"joined_rooms": self.account.joined_room_ids()})
+
+    async def room_state(self, request):
+        return web.json_response(self.account.state(request.match_info["room_id"]))
+
+    async def room_messages(self, request):
+        room_id = request.match_info["room_id"]
+        limit = int(request.query.get("limit", 10))
+        return web.json_response(self.account.messages(room_id, request.query.get("from"), limit))
+
+    async def room_context(self, request):
+        room_id = request.match_info["room_id"]
+        return web.json_response(self.account.context(room_id, request.match_info["event_id"]))
+
+    async def room_send(self, request):
+        content = await request.json()
+        self._batch += 1
+        event = {
+            "type": request.match_info["event_type"],
+            "event_id": f"$sent_{self._batch}",
+            "sender": USER_ID,
+            "origin_server_ts": int(time.time() * 1000),
+            "content": content,
+            "unsigned": {"transaction_id": request.match_info["txn_id"]},
+        }
+        self._sent.append((self._batch, request.match_info["room_id"], event))
+        if self._new_events:
+            self._new_events.set()
+            self._new_events = None
+        return web.json_response({"event_id": event["event_id"]})
+
+    async def room_invite(self, request):
+        return web.json_response({})
+
+    async def hierarchy(self, request):
+        return web.json_response(self.account.hierarchy(request.match_info["room_id"]))
+
+class ServerThread(threading.Thread):
+    """
+    Runs a StandInHomeserver on its own event loop in a background thread,
+    so serving requests does not share a loop with the client under test.
+    """
+
+    def __init__(self, server: StandInHomeserver, host: str = "127.0.0.1", port: int = 0):
+        super().__init__(daemon=True)
+        self.server = server
+        self.host = host
+        self.port = port
+        self.url = None
+        self._loop = None
+        self._ready = threading.Event()
+
+    def run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        runner = web.AppRunner(self.server.app, access_log=None)
+        self._loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, self.host, self.port)
+        self._loop.run_until_complete(site.start())
+        self.url = f"http://{self.host}:{runner.addresses[0][1]}"
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.run_until_complete(runner.cleanup())
+            self._loop.close()
+
+    def start(self) -> str:
+        """Starts serving and returns the base URL."""
+        super().start()
+        self._ready.wait()
+        return self.url
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self.join()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic account as a stand-in homeserver.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8008)
+    parser.add_argument("--rooms", type=int, default=500, help="joined rooms (default: 500)")
+    parser.add_argument("--spaces", type=int, default=20, help="joined spaces (default: 20)")
+    parser.add_argument("--state-events", type=int, default=30, help="state events per room (default: 30)")
+    parser.add_argument("--events-per-room", type=int, default=20, help="timeline events per room in the initial sync (default: 20)")
+    parser.add_argument("--body-length", type=int, default=0, help="pad message bodies to this many characters (default: 0)")
+    parser.add_argument("--delay", type=float, default=0.0, help="delay before every response, in ms (default: 0)")
+    args = parser.parse_args()
+
+    account = SyntheticAccount(
+        rooms=args.rooms,
+        spaces=args.spaces,
+        state_events=args.state_events,
+        events_per_room=args.events_per_room,
+        body_length=args.body_length,
+    )
+    server = StandInHomeserver(account, delay=args.delay / 1000)
+    print(f"Serving {len(account.joined_room_ids())} rooms on http://{args.host}:{args.port} "
+          f"(password: {PASSWORD})")
+    web.run_app(server.app, host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+# BENCH/synthetic.py
+# Synthetic account data and an in-process stand-in for nio's AsyncClient,
+# so the client code paths can be measured without a homeserver.
+import asyncio
+import contextlib
+import os
+import shutil
+import tempfile
+
+import nio
+
+USER_ID = "@bench:localhost"
+HOMESERVER = "http://bench.invalid"
+
+class SyntheticAccount:
+    """
+    A made-up account: 'rooms' joined rooms spread over 'spaces' joined
+    spaces, each with 'state_events' state events and 'history' messages
+    whose bodies are padded to 'body_length' characters.
+
+    Everything is derived from indexes, so two runs with the same sizes see
+    the same data. All generators return plain JSON dicts, as they would
+    arrive from the server.
+    """
+
+    def __init__(self, rooms: int = 200, spaces: int = 10, state_events: int = 20,
+                 events_per_room: int = 20, history: int = 1000, body_length: int = 0):
+        self.room_count = rooms
+        self.space_count = spaces
+        self.state_events = state_events
+        self.events_per_room = events_per_room
+        self.history = history
+        self.body_length = body_length
+
+        self.space_ids = [f"!space{i}:localhost" for i in range(spaces)]
+        self.room_ids = [f"!room{i}:localhost" for i in range(rooms)]
+        self.children = {space_id: [] for space_id in self.space_ids}
+        for i, room_id in enumerate(self.room_ids):
+            if spaces:
+                self.children[self.space_ids[i % spaces]].append(room_id)
+
+        self._sync_count = 0
+
+    def joined_room_ids(self) -> list:
+        return self.space_ids + self.room_ids
+
+    def is_space(self, room_id: str) -> bool:
+        return room_id in self.children
+
+    def name(self, room_id: str) -> str:
+        return ("Space " if self.is_space(room_id) else "Room ") + room_id[1:].split(":")[0]
+
+    # Events
+
+    def state(self, room_id: str) -> list:
+        """The full state of a room; members pad it to 'state_events'."""
+        create = {"creator": USER_ID, "room_version": "10"}
+        if self.is_space(room_id):
+            create["type"] = "m.space"
+
+        events = [
+            _state_event(room_id, "m.room.create", "", create, 0),
+            _state_event(room_id, "m.room.name", "", {"name": self.name(room_id)}, 1),
+            _state_event(room_id, "m.room.power_levels", "", {"users": {USER_ID: 100}, "users_default": 0}, 2),
+            _state_event(room_id, "m.room.join_rules", "", {"join_rule": "invite"}, 3),
+        ]
+        for child_id in self.children.get(room_id, []):
+            events.append(_state_event(room_id, "m.space.child", child_id, {"via": ["localhost"]}, len(events)))
+
+        member = 0
+        while len(events) < self.state_events:
+            user_id = USER_ID if member == 0 else f"@user{member}:localhost"
+            events.append(_state_event(room_id, "m.room.member", user_id, {"membership": "join"}, len(events)))
+            member += 1
+        return events
+
+    def message(self, room_id: str, index: int) -> dict:
+        """Message number 'index' of a room; higher is newer."""
+        body = f"Message {index} in {room_id}, lorem ipsum dolor sit amet."
+        return {
+            "type": "m.room.message",
+            "event_id": f"${room_id[1:].split(':')[0]}_{index}",
+            "sender": f"@user{index % 7}:localhost" if index % 7 else USER_ID,
+            "origin_server_ts": 1_700_000_000_000 + index * 1000,
+            "content": {"msgtype": "m.text", "body": body.ljust(self.body_length, ".")},
+        }
+
+    # Responses
+
+    def initial_sync(self) -> dict:
+        """A sync without 'since': full state and the newest messages of every room."""
+        join = {}
+        for room_id in self.joined_room_ids():
+            newest = self.history
+            join[room_id] = joined_room(
+                self.state(room_id),
+                [self.message(room_id, i) for i in range(newest - self.events_per_room, newest)],
+                prev_batch=_token(room_id, newest - self.events_per_room),
+            )
+        return sync_body(join, f"s{self._sync_count}")
+
+    def incremental_sync(self, events_per_room: int = 3, active_rooms: int = None) -> dict:
+        """
+        A sync after the initial one: new messages in the first
+        'active_rooms' rooms (all by default), no state.
+        """
+        self._sync_count += 1
+        first = self.history + self._sync_count * events_per_room
+        join = {}
+        for room_id in self.joined_room_ids()[:active_rooms]:
+            join[room_id] = joined_room(
+                [],
+                [self.message(room_id, i) for i in range(first, first + events_per_room)],
+                prev_batch=_token(room_id, first),
+            )
+        return sync_body(join, f"s{self._sync_count}")
+
+    def messages(self, room_id: str, start: str, limit: int) -> dict:
+        """One page of /messages going backwards from 'start'."""
+        position = _position(start, room_id, self.history)
+        oldest = max(0, position - limit)
+        return {
+            "chunk": [self.message(room_id, i) for i in range(position - 1, oldest - 1, -1)],
+            "start": start or "",
+            "end": _token(room_id, oldest),
+        }
+
+    def context(self, room_id: str, event_id: str) -> dict:
+        """/context of a message, without events around it."""
+        index = int(event_id.rsplit("_", 1)[1])
+        return {
+            "start": _token(room_id, index),
+            "end": _token(room_id, index + 1),
+            "event": self.message(room_id, index),
+            "events_before": [],
+            "events_after": [],
+            "state": [],
+        }
+
+    def hierarchy(self, space_id: str) -> dict:
+        """/hierarchy of a space, in a single page."""
+        rooms = [{
+            "room_id": space_id,
+            "name": self.name(space_id),
+            "room_type": "m.space",
+            "num_joined_members": 1,
+            "world_readable": False,
+            "guest_can_join": False,
+            "children_state": [
+                {"type": "m.space.child", "state_key": child_id, "content": {"via": ["localhost"]},
+                 "sender": USER_ID, "origin_server_ts": 1_700_000_000_000}
+                for child_id in self.children.get(space_id, [])
+            ],
+        }]
+        for child_id in self.children.get(space_id, []):
+            rooms.append({
+                "room_id": child_id,
+                "name": self.name(child_id),
+                "num_joined_members": 1,
+                "world_readable": False,
+                "guest_can_join": False,
+                "children_state": [],
+            })
+        return {"rooms": rooms}
+
+class MockAsyncClient:
+    """
+    Answers the AsyncClient calls MatrixClient makes from a SyntheticAccount.
+    Responses are parsed by nio as usual; 'latency' adds a fixed delay per
+    request to model the network.
+    """
+
+    def __init__(self, account: SyntheticAccount, latency: float = 0.0):
+        self.account = account
+        self.latency = latency
+        self.homeserver = HOMESERVER
+        self.user_id = USER_ID
+        self.device_id = "BENCH"
+        self.access_token = "bench-token"
+        self.requests = 0
+
+    async def _request(self):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+
+    async def joined_rooms(self):
+        await self._request()
+        return nio.JoinedRoomsResponse.from_dict({"joined_rooms": self.account.joined_room_ids()})
+
+    async def room_get_state(self, room_id: str):
+        await self._request()
+        return nio.RoomGetStateResponse.from_dict(self.account.state(room_id), room_id)
+
+    async def room_messages(self, room_id: str, start: str = None, end: str = None,
+                            direction="b", limit: int = 10, message_filter=None):
+        await self._request()
+        return nio.RoomMessagesResponse.from_dict(self.account.messages(room_id, start, limit), room_id)
+
+    async def room_context(self, room_id: str, event_id: str, limit: int = None):
+        await self._request()
+        return nio.RoomContextResponse.from_dict(self.account.context(room_id, event_id), room_id)
+
+    async def space_get_hierarchy(self, space_id: str, from_page: str = None, limit: int = None,
+                                  max_depth: int = None, suggested_only: bool = False):
+        await self._request()
+        return nio.SpaceGetHierarchyResponse.from_dict(self.account.hierarchy(space_id))
+
+    async def sync(self, timeout=0, sync_filter=None, since=None, full_state=None, set_presence=None):
+        await self._request()
+        if since:
+            return nio.SyncResponse.from_dict(self.account.incremental_sync())
+        return nio.SyncResponse.from_dict(self.account.initial_sync())
+
+    async def close(self):
+        pass
+
+@contextlib.contextmanager
+def temporary_session_store():
+    """
+    Points the session store (sync state and saved credentials) at a
+    temporary directory for the duration, so runs never touch STORE/session.
+    """
+    import CORE.matrix_client as matrix_client
+    import UTILS.session_store as session_store
+
+    saved = (session_store.SESSION_DIR, session_store.CREDENTIALS_PATH, matrix_client.SESSION_DIR)
+    temp_dir = tempfile.mkdtemp(prefix="fastliner-bench-")
+    session_store.SESSION_DIR = matrix_client.SESSION_DIR = temp_dir
+    session_store.CREDENTIALS_PATH = os.path.join(temp_dir, "credentials.json")
+    try:
+        yield temp_dir
+    finally:
+        session_store.SessionStore._data = None
+        session_store.SessionStore._path = None
+        session_store.SESSION_DIR, session_store.CREDENTIALS_PATH, matrix_client.SESSION_DIR = saved
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def _state_event(room_id: str, event_type: str, state_key: str, content: dict, index: int) -> dict:
+    return {
+        "type": event_type,
+        "state_key": state_key,
+        "content": content,
+        "event_id": f"$state_{room_id[1:].split(':')[0]}_{index}",
+        "sender": USER_ID,
+        "origin_server_ts": 1_700_000_000_000 + index,
+    }
+
+def joined_room(state: list, timeline: list, prev_batch: str) -> dict:
+    """One entry of rooms.join in a sync response."""
+    return {
+        "state": {"events": state},
+        "timeline": {"events": timeline, "limited": False, "prev_batch": prev_batch},
+        "ephemeral": {"events": []},
+        "account_data": {"events": []},
+        "summary": {},
+        "unread_notifications": {},
+    }
+
+def sync_body(join: dict, next_batch: str) -> dict:
+    """A /sync response with the given joined rooms and nothing else."""
+    return {
+        "next_batch": next_batch,
+        "rooms": {"join": join, "invite": {}, "leave": {}},
+        "presence": {"events": []},
+        "account_data": {"events": []},
+        "to_device": {"events": []},
+        "device_lists": {"changed": [], "left": []},
+        "device_one_time_keys_count": {},
+    }
+
+def _token(room_id: str, position: int) -> str:
+    return f"t{position}_{room_id}"
+
+def _position(token: str, room_id: str, default: int) -> int:
+    """Events before a pagination token; unknown tokens start at the newest."""
+    prefix, _, token_room = (token or "").partition("_")
+    if token_room == room_id and prefix[1:].isdigit():
+        return int(prefix[1:])
+    return default
@@ -0,0 +1,48 @@
+class Event:
+    """
+    One kind of client event. Handlers are called synchronously, in the
+    order they were connected, with the arguments described by 'args'.
+    Works without Qt, so the client can run headless.
+    """
+    __slots__ = ("name", "args", "_handlers")
+
+    def __init__(self, name: str, *args: str):
+        self.name = name
+        self.args = args
+        self._handlers = []
+
+    def connect(self, handler):
+        self._handlers.append(handler)
+
+    def disconnect(self, handler):
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    def emit(self, *args):
+        for handler in list(self._handlers):
+            handler(*args)
+
+
+class ClientEvents:
+    """
+    Everything MatrixClient reports to its observers. A GUI bridges these
+    to its own signals; a headless runner connects plain callbacks.
+    """
+
+    def __init__(self):
+        # A line of output for the user, and its role ("system", "error", ...).
+        self.message = Event("message", "text: str", "role: str")
+        # Several such lines at once: [(text, role), ...].
+        self.message_batch = Event("message_batch", "lines: list")
+        # The full room list: [room details dict, ...].
+        self.rooms = Event("rooms", "room_details: list")
+        # A partial room list update: {"upsert": [room, ...], "remove": [room_id, ...]}.
+        self.room_patch = Event("room_patch", "patch: dict")
+        # The session ended (logout, or the server revoked the token).
+        self.logout = Event("logout")
+        # New events of a room from sync, oldest first.
+        self.timeline = Event("timeline", "room_id: str", "events: list")
+        # The buffered timeline of a room replaces what was shown.
+        self.timeline_reset = Event("timeline_reset", "room_id: str", "events: list", "prev_batch: str | None")
+        # An older page of a room; prev_batch is None at the start of the room.
+        self.history = Event("history", "room_id: str", "events: list", "prev_batch: str | None")
@@ -1,11 +1,9 @@
 from PySide6.QtCore import QObject
 
 from UTILS.signals import SignalManager
-
-from UI.settings_window import SettingsWindow
-from UI.room_settings_window import RoomSettingsWindow
-
-from CORE.matrix_client import MatrixClient
+from UTILS.startup_profiler import StartupProfiler
+from UTILS.request_metrics import RequestMetrics
+from UTILS.loop_monitor import LoopMonitor
 
 import platform, os
 
@@ -24,6 +22,8 @@ class CommandHandler(QObject):
         
         self.logged_in = False
 
+        self.signals.logoutSignal.connect(self._on_logout)
+
     def handle_command(self, command: str, args: list):
         
         cmd_lower = command.lower()
@@ -39,7 +39,11 @@ class CommandHandler(QObject):
                 "  /fullscreen\n"
                 "  /clear\n"
                 "  /sidebar\n"
+                "  /filter [text]\n"
                 "  /web\n"
+                "  /startup\n"
+                "  /stats [export [<path>]|reset]\n"
+                "  /looplag [reset]\n"
                 "  -\n"
                 "  /login <username> <password>\n"
                 "  /logout\n"
@@ -167,12 +171,50 @@ class CommandHandler(QObject):
             else:
                 self.signals.messageSignal.emit("No main window reference. Cannot toggle sidebar.", "error")
 
+        elif cmd_lower == "/filter":
+            if self.main_window:
+                self.main_window.set_sidebar_filter(" ".join(args))
+            else:
+                self.signals.messageSignal.emit("No main window reference. Cannot filter sidebar.", "error")
+
         elif cmd_lower == "/web":
             if self.main_window:
                 self.main_window.toggle_callwidget()
             else:
                 self.signals.messageSignal.emit("No main window reference. Cannot toggle call.", "error")             
 
+        elif cmd_lower == "/startup":
+            self.signals.messageBatchSignal.emit(
+                [(line, "debug") for line in StartupProfiler.report()]
+            )
+
+        elif cmd_lower == "/stats":
+            action = args[0].lower() if args else ""
+            if action == "export":
+                try:
+                    path = RequestMetrics.export(args[1] if len(args) > 1 else None)
+                    self.signals.messageSignal.emit(f"Request statistics written to {path}.", "success")
+                except OSError as e:
+                    self.signals.messageSignal.emit(f"Could not write request statistics: {e}", "error")
+            elif action == "reset":
+                RequestMetrics.reset()
+                self.signals.messageSignal.emit("Request statistics cleared.", "system")
+            elif action:
+                self.signals.messageSignal.emit("Usage: /stats [export [<path>]|reset]", "warning")
+            else:
+                self.signals.messageBatchSignal.emit(
+                    [(line, "debug") for line in RequestMetrics.report()]
+                )
+
+        elif cmd_lower == "/looplag":
+            if args and args[0].lower() == "reset":
+                LoopMonitor.reset()
+                self.signals.messageSignal.emit("Event loop statistics cleared.", "system")
+            else:
+                self.signals.messageBatchSignal.emit(
+                    [(line, "debug") for line in LoopMonitor.report()]
+                )
+
         elif cmd_lower == "/login":
             if len(args) != 2:
                 self.signals.messageSignal.emit("Usage: /login <username> <password>", "warning")
@@ -192,7 +234,9 @@ class CommandHandler(QObject):
             else:
                 room_id = args[0]
                 self.signals.messageSignal.emit(f"Opening room settings for room {room_id}...", "system")
-                
+
+                # UI windows are imported on first use only.
+                from UI.room_settings_window import RoomSettingsWindow
                 self.room_settings_window = RoomSettingsWindow(room_id, self.matrix_client)
                 self.room_settings_window.show()            
 
@@ -279,6 +323,18 @@ class CommandHandler(QObject):
         else:
             self.signals.messageSignal.emit("Login failed. Check your credentials.", "error")
 
+    async def restore_session(self):
+
+        success = await self.matrix_client.restore_login()
+        if success:
+            self.logged_in = True
+        else:
+            self.signals.messageSignal.emit("No saved session. Use /login <username> <password>.", "system")
+
+    def _on_logout(self):
+
+        self.logged_in = False
+
     async def _handle_logout(self):
 
         success = await self.matrix_client.logout()
@@ -291,6 +347,7 @@ class CommandHandler(QObject):
     def _handle_settings(self):
     
         if self.settings_window is None or not self.settings_window.isVisible():
+            from UI.settings_window import SettingsWindow
             self.settings_window = SettingsWindow()
             self.settings_window.show()
         else:
@@ -0,0 +1,83 @@
+import asyncio
+import contextvars
+import re
+import time
+
+from nio import AsyncClient, ErrorResponse
+
+from UTILS.request_metrics import RequestMetrics
+
+# Timing of the request the current task is making; send() runs inside
+# _send() on the same task, so it can report into it.
+_current_request = contextvars.ContextVar("current_request", default=None)
+
+
+def endpoint_name(response_class) -> str:
+    """RoomMessagesResponse -> room_messages."""
+    name = response_class.__name__
+    if name.endswith("Response"):
+        name = name[:-len("Response")]
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+def _body_size(data) -> int:
+    """Bytes of a request body; streamed bodies (file uploads) count as 0."""
+    if isinstance(data, str):
+        return len(data.encode())
+    if isinstance(data, bytes):
+        return len(data)
+    return 0
+
+
+class InstrumentedAsyncClient(AsyncClient):
+    """
+    AsyncClient that records every homeserver request in RequestMetrics:
+    the whole call including retries and parsing, the time until the
+    response headers of the last attempt, errors and bytes (received bytes
+    are the decoded bodies).
+    """
+
+    async def _send(self, response_class, method, path, data=None, *args, **kwargs):
+        timing = {"wait": None, "received": 0}
+        token = _current_request.set(timing)
+        started = time.perf_counter()
+        ok = False
+        try:
+            response = await super()._send(response_class, method, path, data, *args, **kwargs)
+            ok = not isinstance(response, ErrorResponse)
+            return response
+        except asyncio.CancelledError:
+            # Abandoned by the client (e.g. the sync at logout), not failed.
+            timing = None
+            raise
+        finally:
+            _current_request.reset(token)
+            if timing is not None:
+                RequestMetrics.record(
+                    endpoint_name(response_class),
+                    time.perf_counter() - started,
+                    ok=ok,
+                    wait=timing["wait"],
+                    bytes_sent=_body_size(data),
+                    bytes_received=timing["received"],
+                )
+
+    async def send(self, *args, **kwargs):
+        started = time.perf_counter()
+        response = await super().send(*args, **kwargs)
+        timing = _current_request.get()
+        if timing is not None:
+            timing["wait"] = time.perf_counter() - started
+        return response
+
+    async def create_matrix_response(self, response_class, transport_response, data=None, save_to=None):
+        timing = _current_request.get()
+        if timing is not None:
+            if save_to is None:
+                # Bodies are often chunked without a Content-Length, so count
+                # what is read; aiohttp keeps it for nio's own read().
+                timing["received"] += len(await transport_response.read())
+            else:
+                # Streamed to a file by nio; only the header is known.
+                timing["received"] += transport_response.content_length or 0
+        return await super().create_matrix_response(response_class, transport_response, data, save_to)
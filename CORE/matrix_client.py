@@ -1,190 +1,448 @@
 from nio import (
-    AsyncClient, 
     LoginResponse, 
     LogoutResponse,
     SyncResponse,
     SyncError,
     RoomPutStateResponse,
+    UploadFilterResponse,
 )
 import nio
 from nio.api import RoomPreset, RoomVisibility
 
 from UTILS.open_room_manager import OpenRoomManager
 
+from CORE.refresh_scheduler import RefreshScheduler
+from CORE.client_events import ClientEvents
+from CORE.instrumented_client import InstrumentedAsyncClient
+
 from UTILS.config_manager import ConfigManager
+from UTILS.session_store import SessionStore, SESSION_DIR
+from UTILS.timeline_manager import TimelineManager
+from UTILS.room_state_cache import RoomStateCache
+from UTILS.space_graph import SpaceGraph
+from UTILS.event_formatter import EventFormatter
+from UTILS.startup_profiler import StartupProfiler
+from UTILS.request_metrics import RequestMetrics
 
 import asyncio
 import aiohttp
-from datetime import datetime
 
 import json
+import os
+import time
+
+
+# State event types that change how a room is shown in the sidebar.
+SIDEBAR_STATE_TYPES = {"m.room.name", "m.room.create", "m.space.child"}
 
 
 class MatrixClient:
-    def __init__(self, signals):
+    def __init__(self, events: ClientEvents = None):
         self.homeserver = ConfigManager().get("homeserver")
         self.client = None
-        self.signals = signals
+        # Observers connect to these; the client itself knows nothing of Qt.
+        self.events = events or ClientEvents()
 
         #sync control
         self.running = False
+        self.sync_task = None
         self.next_batch = None
 
         self.pending_invites = {}
+
+        # Last room list sent to the sidebar, by room ID.
+        self.published_rooms = {}
+
+        self.room_refresh = RefreshScheduler(
+            self.fetch_rooms_and_spaces,
+            delay=ConfigManager.get("room_refresh_delay_ms", 300) / 1000,
+        )
+
+        ConfigManager.subscribe("homeserver", self.on_homeserver_changed)
+        ConfigManager.subscribe("room_refresh_delay_ms", self.on_refresh_delay_changed)
+
+    def on_homeserver_changed(self, homeserver):
+        """
+        The homeserver is read at login, so a change is picked up by the
+        next /login; a running session stays on its server.
+        """
+        self.homeserver = homeserver
+        if self.client and self.client.access_token:
+            self.events.message.emit(
+                f"Homeserver set to {homeserver}. It will be used at the next login.", "system"
+            )
+        else:
+            self.events.message.emit(f"Homeserver: {homeserver}", "system")
+
+    def on_refresh_delay_changed(self, delay_ms):
+        self.room_refresh.delay = (delay_ms or 0) / 1000
     
     async def login(self, username, password):
       
-        self.client = AsyncClient(self.homeserver, username)
-        self.signals.messageSignal.emit(f"Homeserver: {self.homeserver}", "system")
+        # Logging in again as the same user reuses the saved device, so the
+        # server-side state of that device is kept.
+        device_id = ""
+        credentials = SessionStore.load_credentials()
+        if (credentials and credentials["homeserver"] == self.homeserver
+                and credentials.get("username") == username):
+            device_id = credentials["device_id"]
+
+        os.makedirs(SESSION_DIR, exist_ok=True)
+        self.client = InstrumentedAsyncClient(self.homeserver, username, device_id=device_id, store_path=SESSION_DIR)
+        self.events.message.emit(f"Homeserver: {self.homeserver}", "system")
         try:
-            response = await asyncio.wait_for(self.client.login(password), timeout=5)
-            self.signals.messageSignal.emit(f"Raw response: {response}", "server")
+            login_timeout = ConfigManager.get("login_timeout", 5)
+            response = await asyncio.wait_for(self.client.login(password), timeout=login_timeout)
+            self.events.message.emit(f"Raw response: {response}", "server")
     
             if isinstance(response, LoginResponse):
                 self.client.user_id = response.user_id
                 self.client.access_token = response.access_token
-                self.signals.messageSignal.emit(
+                self.events.message.emit(
                     f"Login successful as {self.client.user_id}.", "success"
                 )
-                asyncio.create_task(self.sync_forever())
-                asyncio.create_task(self.fetch_rooms_and_spaces())
+                StartupProfiler.mark("login")
+                if ConfigManager.get("remember_session", True):
+                    SessionStore.save_credentials(
+                        self.homeserver,
+                        username,
+                        response.user_id,
+                        response.device_id,
+                        response.access_token,
+                    )
+                self.load_session()
+                self.sync_task = asyncio.create_task(self.sync_forever())
+                self.room_refresh.request()
                 return True
             else:
-                self.signals.messageSignal.emit(
+                self.events.message.emit(
                     f"Login failed: {response.message if hasattr(response, 'message') else 'Unknown error'}", "error"
                 )
                 await self.client.close()
                 return False
         except asyncio.TimeoutError:
-            self.signals.messageSignal.emit("Login process timed out.", "error")
+            self.events.message.emit("Login process timed out.", "error")
             await self.client.close()
             return False
         except Exception as e:
-            self.signals.messageSignal.emit(f"Login error: {str(e)}", "error")
+            self.events.message.emit(f"Login error: {str(e)}", "error")
             await self.client.close()
             return False
+
+    async def restore_login(self):
+        """
+        Resumes the saved session of the last login without a password round
+        trip. The first sync validates the token; if the server rejects it the
+        saved session is dropped and /login is required again.
+        """
+        if not ConfigManager.get("remember_session", True):
+            return False
+
+        credentials = SessionStore.load_credentials()
+        if not credentials or credentials["homeserver"] != self.homeserver:
+            return False
+
+        os.makedirs(SESSION_DIR, exist_ok=True)
+        self.client = InstrumentedAsyncClient(
+            self.homeserver,
+            credentials["user_id"],
+            device_id=credentials["device_id"],
+            store_path=SESSION_DIR,
+        )
+        self.client.restore_login(
+            credentials["user_id"],
+            credentials["device_id"],
+            credentials["access_token"],
+        )
+        self.events.message.emit(
+            f"Restored session as {self.client.user_id}.", "success"
+        )
+        StartupProfiler.mark("login")
+        self.load_session()
+        self.sync_task = asyncio.create_task(self.sync_forever())
+        self.room_refresh.request()
+        return True
         
     async def logout(self):
 
         if not self.client or not self.client.access_token:
-            self.signals.messageSignal.emit("You are not logged in.", "warning")
+            self.events.message.emit("You are not logged in.", "warning")
             return False
 
         try:
             response = await self.client.logout()
             
             if isinstance(response, LogoutResponse):
+                SessionStore.clear_credentials()
                 self.client.user_id = None
                 self.client.access_token = None
-                self.signals.messageSignal.emit("Logged out successfully.", "success")
+                self.events.message.emit("Logged out successfully.", "success")
                 await self.stop()
-                self.signals.roomSignal.emit([])
-                self.signals.logoutSignal.emit()
+                SessionStore.close()
+                TimelineManager.clear()
+                RoomStateCache.clear()
+                SpaceGraph.clear()
+                self.next_batch = None
+                self.publish_rooms([])
+                self.events.logout.emit()
                 return True
             else:
-                self.signals.messageSignal.emit(
+                self.events.message.emit(
                     f"Logout failed: {response.message if hasattr(response, 'message') else 'Unknown error'}",
                     "error",
                 )
                 return False
 
         except Exception as e:
-            self.signals.messageSignal.emit(f"Logout error: {str(e)}", "error")
+            self.events.message.emit(f"Logout error: {str(e)}", "error")
             return False    
 
+    def load_session(self):
+        """
+        Restores the sync token and cached room list of the logged in account,
+        so the first sync is incremental and the sidebar is drawn from disk.
+        """
+        SessionStore.load(self.client.user_id, self.homeserver)
+        self.next_batch = SessionStore.get_sync_token()
+        RoomStateCache.load(SessionStore.get_room_state())
+        SpaceGraph.load(SessionStore.get_space_graph())
+
+        for room_id in SessionStore.get_timeline_room_ids():
+            sources, prev_batch = SessionStore.get_timeline(room_id)
+            TimelineManager.seed(room_id, [nio.Event.parse_event(source) for source in sources])
+            TimelineManager.get(room_id).prev_batch = prev_batch
+
+        cached_rooms = SessionStore.get_rooms()
+        if cached_rooms:
+            self.publish_rooms(cached_rooms)
+
+        if self.next_batch:
+            self.events.message.emit("Restored session state from disk.", "system")
+
+    def build_sync_filter(self) -> dict:
+        """
+        Builds the sync filter definition from the 'sync_filter' config.
+        Only the timelines and the room state the client renders are kept;
+        presence, ephemeral events and account data are dropped by default.
+        """
+        options = ConfigManager.get("sync_filter", {})
+        lazy_load_members = options.get("lazy_load_members", True)
+
+        timeline = {
+            "limit": options.get("timeline_limit", 20),
+            "lazy_load_members": lazy_load_members,
+        }
+        exclude_event_types = options.get("exclude_event_types", [])
+        if exclude_event_types:
+            timeline["not_types"] = list(exclude_event_types)
+
+        room = {
+            "timeline": timeline,
+            "state": {"lazy_load_members": lazy_load_members},
+        }
+        if not options.get("include_ephemeral", False):
+            room["ephemeral"] = {"not_types": ["*"]}
+        if not options.get("include_account_data", False):
+            room["account_data"] = {"not_types": ["*"]}
+
+        definition = {"room": room}
+        if not options.get("include_presence", False):
+            definition["presence"] = {"not_types": ["*"]}
+        if not options.get("include_account_data", False):
+            definition["account_data"] = {"not_types": ["*"]}
+
+        return definition
+
+    async def ensure_sync_filter(self):
+        """
+        Returns the filter to sync with. The definition is uploaded once and
+        then reused by ID until the config changes; if the upload fails the
+        definition is sent inline instead.
+        """
+        definition = self.build_sync_filter()
+
+        filter_id = SessionStore.get_sync_filter_id(definition)
+        if filter_id:
+            return filter_id
+
+        try:
+            response = await self.client.upload_filter(
+                presence=definition.get("presence"),
+                account_data=definition.get("account_data"),
+                room=definition.get("room"),
+            )
+            if isinstance(response, UploadFilterResponse):
+                SessionStore.set_sync_filter_id(definition, response.filter_id)
+                return response.filter_id
+
+            self.events.message.emit(
+                f"Could not upload sync filter: {getattr(response, 'message', 'Unknown error')}", "warning"
+            )
+        except Exception as e:
+            self.events.message.emit(f"Could not upload sync filter: {e}", "warning")
+
+        return definition
+
     async def sync_forever(self):
     
         if not self.client or not self.client.access_token:
-            self.signals.messageSignal.emit("Client is not initialized or logged in. Cannot start syncing.", "error")
+            self.events.message.emit("Client is not initialized or logged in. Cannot start syncing.", "error")
             return
 
         self.running = True
-        self.signals.messageSignal.emit("Starting batch sync...", "system")
+        self.events.message.emit("Starting batch sync...", "system")
 
         try:
+            sync_filter = await self.ensure_sync_filter()
+
             while self.running:
                 try:
-                    response = await self.client.sync(timeout=5000, since=self.next_batch, full_state=False)
+                    since = self.next_batch
+                    request_started = time.perf_counter()
+                    response = await self.client.sync(
+                        timeout=5000,
+                        sync_filter=sync_filter,
+                        since=self.next_batch,
+                        full_state=False,
+                    )
 
                     if isinstance(response, SyncResponse):
+                        process_started = time.perf_counter()
                         self.next_batch = response.next_batch
 
-                        await self.process_sync_response(response)
+                        await self.process_sync_response(response, since)
+
+                        SessionStore.set_sync_token(self.next_batch)
+                        SessionStore.save()
+                        RequestMetrics.record_sync_cycle(
+                            process_started - request_started,
+                            time.perf_counter() - process_started,
+                            self._count_sync_events(response),
+                        )
+
+                        StartupProfiler.mark("first_sync")
+                        StartupProfiler.finish()
+
+                    elif isinstance(response, SyncError) and response.status_code == "M_UNKNOWN_TOKEN":
+                        self.events.message.emit(
+                            "Session expired or was revoked. Please /login again.", "error"
+                        )
+                        SessionStore.clear_credentials()
+                        SessionStore.close()
+                        TimelineManager.clear()
+                        RoomStateCache.clear()
+                        SpaceGraph.clear()
+                        self.next_batch = None
+                        self.client.access_token = None
+                        self.room_refresh.cancel()
+                        await self.client.close()
+                        self.publish_rooms([])
+                        self.events.logout.emit()
+                        break
 
                     elif isinstance(response, SyncError):
-                        self.signals.messageSignal.emit(f"Sync error occurred: {response.message}", "error")
+                        self.events.message.emit(f"Sync error occurred: {response.message}", "error")
                         await asyncio.sleep(5)
 
                     else:
-                        self.signals.messageSignal.emit("Unexpected sync response type.", "error")
+                        self.events.message.emit("Unexpected sync response type.", "error")
 
                 except aiohttp.ClientError as e:
 
-                    self.signals.messageSignal.emit(f"HTTP error during sync: {e}", "error")
+                    self.events.message.emit(f"HTTP error during sync: {e}", "error")
                     await asyncio.sleep(5)
 
                 except Exception as e:
 
-                    self.signals.messageSignal.emit(f"Unexpected error during sync: {e}", "error")
+                    self.events.message.emit(f"Unexpected error during sync: {e}", "error")
                     await asyncio.sleep(5)
 
         except asyncio.CancelledError:
 
-            self.signals.messageSignal.emit("Sync task was cancelled.", "warning")
+            self.events.message.emit("Sync task was cancelled.", "warning")
 
         except Exception as e:
 
-            self.signals.messageSignal.emit("Critical error in sync_forever.", "error")
+            self.events.message.emit("Critical error in sync_forever.", "error")
 
         finally:
 
             self.running = False
 
 
-    async def process_sync_response(self, response: SyncResponse):
+    @staticmethod
+    def _count_sync_events(response: SyncResponse) -> int:
+        if not response.rooms or not hasattr(response.rooms, "join"):
+            return 0
+        return sum(
+            len(room.state) + (len(room.timeline.events) if room.timeline else 0)
+            for room in response.rooms.join.values()
+        )
+
+    async def process_sync_response(self, response: SyncResponse, since: str = None):
        
         open_room_id = OpenRoomManager.get_current_room()
         
+        rooms_changed = False
+        renamed_rooms = []
+
         if response.rooms and hasattr(response.rooms, "join"):
             for room_id, joined_room in response.rooms.join.items():
                 
-               
-                if room_id != open_room_id:
-                    continue
-
                 timeline = joined_room.timeline
-                if timeline and timeline.events:
-                    for event in timeline.events:
-                        
-                        if isinstance(event, nio.RoomMessageText):
-                            sender = event.sender
-                            ts = event.server_timestamp
-                            message = event.body
-                            time_str = (
-                                datetime.fromtimestamp(ts / 1000).strftime("%Y-%m-%d %H:%M:%S")
-                                if ts else "unknown"
-                            )
-                            formatted_message = f"{sender} [{time_str}] : {message}"
-                            self.signals.messageSignal.emit(formatted_message, "user")
-                        else:
-                            
-                            sender = getattr(event, "sender", "server")
-                            ts = getattr(event, "server_timestamp", None)
-                            time_str = (datetime.fromtimestamp(ts / 1000).strftime("%Y-%m-%d %H:%M:%S")
-                                        if ts else "unknown")
-                            
-                            content = getattr(event, "content", {})
+                timeline_events = timeline.events if timeline else []
 
-                            if not content and hasattr(event, "source"):
-                                content = event.source.get("content", {})
+                state_sources = [event.source for event in joined_room.state]
+                state_sources.extend(
+                    event.source for event in timeline_events if "state_key" in event.source
+                )
+                known_room = RoomStateCache.has(room_id)
+                changed_types = RoomStateCache.apply_events(room_id, state_sources)
+                if "m.space.child" in changed_types:
+                    SpaceGraph.invalidate(room_id)
+                sidebar_changes = changed_types & SIDEBAR_STATE_TYPES
+                if known_room and sidebar_changes == {"m.room.name"} and room_id in self.published_rooms:
+                    renamed_rooms.append(room_id)
+                elif not known_room or sidebar_changes:
+                    rooms_changed = True
+
+                if not timeline_events:
+                    continue
 
-                            if isinstance(content, dict) and content:
-                                content_str = ", ".join(f"{k}={v}" for k, v in content.items())
-                            else:
-                                content_str = str(content) if content else "(no content)"
-                            
-                            formatted_audit = f"{sender} [{time_str}] : {content_str}"
-                            self.signals.messageSignal.emit(formatted_audit, "server")
+                TimelineManager.append_sync(
+                    room_id, timeline_events, timeline.prev_batch, timeline.limited, since
+                )
+                self._store_timeline(room_id)
+               
+                if room_id == open_room_id:
+                    if timeline.limited:
+                        # The view can no longer be extended; start it over.
+                        self._emit_timeline(room_id)
+                    else:
+                        self.events.timeline.emit(room_id, list(timeline_events))
+
+        if response.rooms and getattr(response.rooms, "leave", None):
+            for room_id in response.rooms.leave:
+                if RoomStateCache.has(room_id):
+                    RoomStateCache.remove(room_id)
+                    TimelineManager.remove(room_id)
+                    SessionStore.remove_timeline(room_id)
+                    rooms_changed = True
+
+        if rooms_changed:
+            self.room_refresh.request()
+        elif renamed_rooms:
+            # A rename only touches one entry, so it is patched in directly.
+            updated = {
+                room_id: dict(
+                    self.published_rooms[room_id],
+                    name=RoomStateCache.room_details(room_id, self.client.user_id)["name"],
+                )
+                for room_id in renamed_rooms
+            }
+            room_details = [updated.get(room_id, room) for room_id, room in self.published_rooms.items()]
+            SessionStore.set_rooms(room_details)
+            self.publish_rooms(room_details)
 
         if response.rooms and hasattr(response.rooms, "invite"):
             
@@ -225,12 +483,16 @@ class MatrixClient:
                          
     async def stop_syncing(self):
 
-        self.signals.messageSignal.emit("Stopping sync process...", "system")
-        self.running = False    
+        self.events.message.emit("Stopping sync process...", "system")
+        self.running = False
+        # A sync request still in flight would outlive the session otherwise.
+        if self.sync_task and not self.sync_task.done():
+            self.sync_task.cancel()
+        self.sync_task = None
 
     async def fetch_rooms_and_spaces(self):
         if not self.client or not self.client.access_token:
-            self.signals.messageSignal.emit("Cannot fetch rooms: Not logged in.", "warning")
+            self.events.message.emit("Cannot fetch rooms: Not logged in.", "warning")
             return
 
         try:
@@ -238,117 +500,339 @@ class MatrixClient:
 
             if hasattr(response, "rooms"):
                 joined_rooms = response.rooms
-                room_details = []
 
+                # Rooms that have not resolved yet keep their cached entry, so
+                # the sidebar only ever fills up while the states stream in.
+                resolved = {}
+                for room in SessionStore.get_rooms():
+                    if room["room_id"] in joined_rooms:
+                        resolved[room["room_id"]] = room
+
+                stream_interval = ConfigManager.get("room_stream_interval", 250) / 1000
+                last_emit = time.monotonic()
+
+                # Rooms whose state could not be fetched; shown by ID unless
+                # cached, and never saved in that form.
+                unresolved = set()
+                async for room_id, details in self._fetch_room_states(joined_rooms):
+                    if details is None:
+                        if room_id in resolved:
+                            continue
+                        unresolved.add(room_id)
+                        details = self._placeholder_details(room_id)
+                    resolved[room_id] = details
+                    if time.monotonic() - last_emit >= stream_interval:
+                        self.publish_rooms(self._build_room_tree(
+                            [resolved[rid] for rid in joined_rooms if rid in resolved]
+                        ))
+                        last_emit = time.monotonic()
+
+                # One hierarchy request per top-level space also covers the
+                # spaces nested in it, so those are skipped once known.
                 for room_id in joined_rooms:
-                    
-                    room_info = {"room_id": room_id, "is_space": False, "name": room_id}
-                    
-                    state_response = await self.client.room_get_state(room_id)
+                    if resolved.get(room_id, {}).get("is_space") and not SpaceGraph.has_children(room_id):
+                        await self.fetch_space_hierarchy(room_id)
 
-                    if hasattr(state_response, "events"):
-                        for event in state_response.events:
-                            event_type = event.get("type")
-                            content = event.get("content", {})
+                room_details = self._build_room_tree(
+                    [resolved[rid] for rid in joined_rooms if rid in resolved]
+                )
 
-                            
-                            if event_type == "m.room.create" and content.get("type") == "m.space":
-                                room_info["is_space"] = True
+                if unresolved:
+                    SessionStore.set_rooms(self._build_room_tree(
+                        [resolved[rid] for rid in joined_rooms if rid in resolved and rid not in unresolved]
+                    ))
+                else:
+                    SessionStore.set_rooms(room_details)
+                self.publish_rooms(room_details)
+                self.events.message.emit(
+                    f"Fetched {len(resolved)} rooms/spaces.", "system"
+                )
+            else:
+                self.events.message.emit("Failed to retrieve room list.", "error")
 
-                            elif event_type == "m.room.name":
-                                room_name = content.get("name")
-                                if room_name:
-                                    room_info["name"] = room_name
+        except Exception as e:
+            self.events.message.emit(f"Error fetching rooms: {str(e)}", "error")       
 
-                            elif event_type == "m.space.child":
-                                child_room_id = event.get("state_key")
-                                content = event.get("content", {})
-                            
-                                if child_room_id and content:
-                                    room_info.setdefault("children", []).append(child_room_id)
+    def publish_rooms(self, room_details: list):
+        """
+        Sends the room list to the sidebar. After the first full list only
+        the entries that changed since the last one are sent, as a patch.
+        """
+        current = {room["room_id"]: room for room in room_details}
 
-                    room_details.append(room_info)
+        if not self.published_rooms or not current:
+            self.events.rooms.emit(room_details)
+        else:
+            upsert = [room for room_id, room in current.items() if self.published_rooms.get(room_id) != room]
+            remove = [room_id for room_id in self.published_rooms if room_id not in current]
+            if upsert or remove:
+                self.events.room_patch.emit({"upsert": upsert, "remove": remove})
+
+        self.published_rooms = current
+
+    def _build_room_tree(self, room_states: list) -> list:
+        """
+        Turns joined room states into the flat sidebar structure. Spaces carry
+        their child IDs ("children" is None when they are not known yet) and
+        rooms that are only reachable through a joined space are added with
+        "joined": False, so nested spaces can be drawn at any depth.
+        """
+        room_details = []
+        known = set()
+
+        for room in room_states:
+            room_info = {
+                "room_id": room["room_id"],
+                "name": room["name"],
+                "is_space": room["is_space"],
+                "joined": True,
+            }
+            if room["is_space"]:
+                children = SpaceGraph.get_children(room["room_id"])
+                room_info["children"] = list(children) if children is not None else list(room.get("children") or [])
+            room_details.append(room_info)
+            known.add(room["room_id"])
+
+        for room in room_states:
+            if not room["is_space"]:
+                continue
+            for room_id in SpaceGraph.descendants(room["room_id"]):
+                node = SpaceGraph.get_room(room_id)
+                if room_id in known or node is None:
+                    continue
+                room_info = {
+                    "room_id": room_id,
+                    "name": node["name"],
+                    "is_space": node["is_space"],
+                    "joined": False,
+                }
+                if node["is_space"]:
+                    children = SpaceGraph.get_children(room_id)
+                    room_info["children"] = list(children) if children is not None else None
+                room_details.append(room_info)
+                known.add(room_id)
+
+        return room_details
+
+    async def fetch_space_hierarchy(self, space_id: str) -> bool:
+        """
+        Loads the tree below a space from /rooms/{id}/hierarchy, page by page,
+        into the space graph.
+        """
+        if not self.client or not self.client.access_token:
+            return False
 
-                room_mapping = {room["room_id"]: room for room in room_details}
-                
-                for room in room_details:
-                    if room.get("is_space") and "children" in room:
-                        updated_children = []
-                        for child_id in room["children"]:
-                            if child_id in room_mapping:
-                                child_info = room_mapping[child_id]
-                                updated_children.append({
-                                    "room_id": child_info["room_id"],
-                                    "name": child_info["name"]
-                                })
-                            else:
-                                updated_children.append({"room_id": child_id, "name": child_id})
-                        room["children"] = updated_children
-
-                self.signals.roomSignal.emit(room_details)
-                self.signals.messageSignal.emit(
-                    f"Fetched {len(room_details)} rooms/spaces.", "system"
+        page_size = ConfigManager.get("space_hierarchy_page_size", 50)
+        from_page = None
+
+        try:
+            while True:
+                response = await self.client.space_get_hierarchy(
+                    space_id, from_page=from_page, limit=page_size
+                )
+                if not isinstance(response, nio.SpaceGetHierarchyResponse):
+                    self.events.message.emit(
+                        f"Warning: Could not fetch hierarchy of space {space_id}: "
+                        f"{getattr(response, 'message', 'Unknown error')}",
+                        "warning"
+                    )
+                    return False
+
+                SpaceGraph.add_hierarchy_rooms(response.rooms)
+                from_page = response.next_batch
+                if not from_page:
+                    return True
+
+        except Exception as e:
+            self.events.message.emit(
+                f"Warning: Could not fetch hierarchy of space {space_id}: {e}", "warning"
+            )
+            return False
+
+    async def expand_space(self, space_id: str):
+        """Fetches the children of a space that the sidebar does not know yet."""
+        if await self.fetch_space_hierarchy(space_id):
+            self.room_refresh.request()
+
+    def _emit_timeline(self, room_id: str):
+        """Shows the buffered timeline of a room in the timeline view."""
+
+        timeline = TimelineManager.get(room_id)
+        self.events.timeline_reset.emit(room_id, list(timeline.events), timeline.prev_batch)
+
+    def _store_timeline(self, room_id: str):
+
+        timeline = TimelineManager.get(room_id)
+        SessionStore.set_timeline(
+            room_id,
+            [event.source for event in timeline.events],
+            timeline.prev_batch,
+        )
+
+    async def open_room(self, room_id: str):
+        """
+        Shows the buffered timeline of a room at once, then makes at most one
+        request of a single page: the newest events skipped by a limited sync,
+        a first page of history if nothing is buffered yet, or a new token if
+        the oldest buffered events were dropped. Anything older is paged in by
+        the view when the user scrolls up.
+        """
+        self._emit_timeline(room_id)
+
+        timeline = TimelineManager.get(room_id)
+        if timeline.gap_end:
+            changed = await self.fill_room_gap(room_id)
+        elif not timeline.events:
+            changed = await self.fetch_room_messages(room_id)
+        elif timeline.prev_batch is None and not timeline.at_start:
+            changed = await self.anchor_room_history(room_id)
+        else:
+            return
+
+        if changed and OpenRoomManager.get_current_room() == room_id:
+            self._emit_timeline(room_id)
+
+    async def fill_room_gap(self, room_id: str) -> bool:
+
+        if not self.client or not self.client.access_token:
+            self.events.message.emit("Cannot fetch room contexts: Not logged in.", "warning")
+            return False
+
+        timeline = TimelineManager.get(room_id)
+        limit = self.timeline_page_size()
+
+        try:
+            response = await self.client.room_messages(
+                room_id,
+                start=timeline.prev_batch,
+                end=timeline.gap_end,
+                limit=limit,
+                direction="b"
+            )
+
+            if isinstance(response, nio.RoomMessagesResponse):
+                complete = len(response.chunk) < limit
+                TimelineManager.close_gap(
+                    room_id, list(reversed(response.chunk)), response.end, complete
                 )
+                self._store_timeline(room_id)
+                return True
             else:
-                self.signals.messageSignal.emit("Failed to retrieve room list.", "error")
+                self.events.message.emit(f"Error: {response.message}", "error")
+        except Exception as e:
+            self.events.message.emit(f"Error fetching room contexts: {str(e)}", "error")
+        return False
+
+    async def anchor_room_history(self, room_id: str) -> bool:
+        """
+        Gets the token to page back from the oldest buffered event, which the
+        buffer loses when older events fall out of it (or are not kept on
+        disk). The context of an event starts just before it.
+        """
+
+        if not self.client or not self.client.access_token:
+            return False
 
+        oldest = TimelineManager.get(room_id).events[0]
+
+        try:
+            # Servers split the limit around the event, so this asks for
+            # little or nothing before it.
+            response = await self.client.room_context(room_id, oldest.event_id, limit=1)
+
+            if isinstance(response, nio.RoomContextResponse):
+                timeline = TimelineManager.get(room_id)
+                if timeline.events and timeline.events[0] is oldest and timeline.prev_batch is None:
+                    if response.events_before:
+                        TimelineManager.prepend(room_id, list(reversed(response.events_before)), response.start)
+                    else:
+                        TimelineManager.anchor(room_id, response.start)
+                    self._store_timeline(room_id)
+                    return True
+            else:
+                self.events.message.emit(f"Error: {response.message}", "error")
         except Exception as e:
-            self.signals.messageSignal.emit(f"Error fetching rooms: {str(e)}", "error")       
+            self.events.message.emit(f"Error fetching room contexts: {str(e)}", "error")
+        return False
 
-    async def fetch_room_messages(self, room_id, limit=1000):
+    async def fetch_room_messages(self, room_id, limit=None) -> bool:
+        """
+        Loads one page of older history in front of the room's buffer.
+        """
         
         if not self.client or not self.client.access_token:
-            self.signals.messageSignal.emit("Cannot fetch room contexts: Not logged in.", "warning")
-            return
+            self.events.message.emit("Cannot fetch room contexts: Not logged in.", "warning")
+            return False
+
+        timeline = TimelineManager.get(room_id)
+        limit = limit or self.timeline_page_size()
     
         try:
             response = await self.client.room_messages(
                 room_id,
-                start="",
+                start=timeline.prev_batch or self.next_batch or "",
                 limit=limit,
-                direction="f"
+                direction="b"
             )
     
             if isinstance(response, nio.RoomMessagesResponse):
-                for event in response.chunk:
-                    if isinstance(event, nio.RoomMessageText):
-                        sender = event.sender
-                        ts = event.server_timestamp
-                        message = event.body
-    
-                        time_str = datetime.fromtimestamp(ts / 1000).strftime("%Y-%m-%d %H:%M:%S") if ts else "unknown"
-    
-                        formatted_message = f"{sender} [{time_str}] : {message}"
+                TimelineManager.prepend(room_id, list(reversed(response.chunk)), response.end)
+                self._store_timeline(room_id)
+                return bool(response.chunk)
+            else:
+                self.events.message.emit(f"Error: {response.message}", "error")
+        except Exception as e:
+            self.events.message.emit(f"Error fetching room contexts: {str(e)}", "error")
+        return False
 
-                        self.signals.messageSignal.emit(formatted_message, "user")
-                    else:
-                        
-                        sender = getattr(event, "sender", "server")
-                        ts = getattr(event, "server_timestamp", None)
-                        time_str = (datetime.fromtimestamp(ts / 1000).strftime("%Y-%m-%d %H:%M:%S")
-                                    if ts else "unknown")
-                        
-                        content = getattr(event, "content", {})
-    
-                        if not content and hasattr(event, "source"):
-                            content = event.source.get("content", {})
+    async def load_older_messages(self, room_id: str, start: str):
+        """
+        Loads the page of history just before 'start' for the timeline view.
+        The view always gets an answer, with no events on failure, so it can
+        page again later.
+        """
+        events, prev_batch = [], start
 
-                        if isinstance(content, dict) and content:
-                            content_str = ", ".join(f"{k}={v}" for k, v in content.items())
-                        else:
-                            content_str = str(content) if content else "(no content)"
-                        
-                        formatted_audit = f"{sender} [{time_str}] : {content_str}"
-                        self.signals.messageSignal.emit(formatted_audit, "server")    
+        if not self.client or not self.client.access_token:
+            self.events.message.emit("Cannot fetch room contexts: Not logged in.", "warning")
+            self.events.history.emit(room_id, events, prev_batch)
+            return
+
+        try:
+            response = await self.client.room_messages(
+                room_id,
+                start=start,
+                limit=self.timeline_page_size(),
+                direction="b"
+            )
+
+            if isinstance(response, nio.RoomMessagesResponse):
+                events = list(reversed(response.chunk))
+                # An empty page means the start of the room was reached.
+                prev_batch = response.end if response.chunk else None
+
+                # Keep the buffer in step while the page still fits in it.
+                timeline = TimelineManager.get(room_id)
+                if (timeline.prev_batch == start and not timeline.gap_end
+                        and len(timeline.events) + len(events) <= timeline.events.maxlen):
+                    TimelineManager.prepend(room_id, events, prev_batch)
+                    self._store_timeline(room_id)
             else:
-                self.signals.messageSignal.emit(f"Error: {response.message}", "error")
+                self.events.message.emit(f"Error: {response.message}", "error")
         except Exception as e:
-            self.signals.messageSignal.emit(f"Error fetching room contexts: {str(e)}", "error")   
+            self.events.message.emit(f"Error fetching room contexts: {str(e)}", "error")
+
+        self.events.history.emit(room_id, events, prev_batch)
+
+    @staticmethod
+    def timeline_page_size() -> int:
+        return max(1, int(ConfigManager.get("timeline_page_size", 30)))
 
     async def send_message(self, room_id: str, message_content: str):
+        """Sends a text message and returns its event ID, or None on failure."""
         
         if not self.client or not self.client.access_token:
-            self.signals.messageSignal.emit("Cannot send message: Not logged in.", "warning")
+            self.events.message.emit("Cannot send message: Not logged in.", "warning")
             return
 
         try:
@@ -363,18 +847,19 @@ class MatrixClient:
             )
             
             if hasattr(response, "event_id") and response.event_id:
-                pass
+                return response.event_id
             else:
-                self.signals.messageSignal.emit(
+                self.events.message.emit(
                     f"Failed to send message: {getattr(response, 'message', 'Unknown error')}", "error"
                 )
         except Exception as e:
-            self.signals.messageSignal.emit(f"Error sending message: {str(e)}", "error")     
+            self.events.message.emit(f"Error sending message: {str(e)}", "error")     
+        return None
 
     async def whoami(self):
       
         if not self.client or not self.client.access_token:
-            self.signals.messageSignal.emit("Cannot determine who you are: Not logged in.", "warning")
+            self.events.message.emit("Cannot determine who you are: Not logged in.", "warning")
             return
 
         try:
@@ -385,27 +870,28 @@ class MatrixClient:
             else:
                 whoami_info = f"User ID: {self.client.user_id} (no display name set)"
             
-            self.signals.messageSignal.emit(whoami_info, "system")
+            self.events.message.emit(whoami_info, "system")
             return whoami_info
 
         except Exception as e:
-            self.signals.messageSignal.emit(f"Whoami error: {str(e)}", "error")
+            self.events.message.emit(f"Whoami error: {str(e)}", "error")
             return None             
 
     async def list_my_events(self, limit: int = 10000):
+        """Lists the user's messages in the open room and returns them as events."""
         
         room_id = OpenRoomManager.get_current_room()
 
         if not self.client or not self.client.access_token:
-            self.signals.messageSignal.emit("Cannot list events: Not logged in.", "warning")
+            self.events.message.emit("Cannot list events: Not logged in.", "warning")
             return
 
         if not self.client.user_id:
-            self.signals.messageSignal.emit("User ID not set; cannot list events.", "warning")
+            self.events.message.emit("User ID not set; cannot list events.", "warning")
             return
         
         if not room_id:
-            self.signals.messageSignal.emit("No room ID set; cannot list events.", "warning")
+            self.events.message.emit("No room ID set; cannot list events.", "warning")
             return
 
         try:
@@ -418,116 +904,133 @@ class MatrixClient:
             )
 
             if isinstance(response, nio.RoomMessagesResponse):
-                my_events = []
-                for event in response.chunk:
-                    
-                    if isinstance(event, nio.RoomMessageText) and event.sender == self.client.user_id:
-                        ts = event.server_timestamp
-                        time_str = datetime.fromtimestamp(ts / 1000).strftime("%Y-%m-%d %H:%M:%S") if ts else "unknown"
-                        
-                        formatted = f"Event ID: {event.event_id} | {event.sender} [{time_str}] : {event.body}"
-                        my_events.append(formatted)
+                my_events = [
+                    event for event in response.chunk
+                    if isinstance(event, nio.RoomMessageText) and event.sender == self.client.user_id
+                ]
 
                 if my_events:
                     
                     my_events.reverse()
-                    for event_str in my_events:
-                        self.signals.messageSignal.emit(event_str, "system")
+                    self.events.message_batch.emit([
+                        (text, "system")
+                        for text, _ in EventFormatter.format_events(my_events, show_event_id=True)
+                    ])
                 else:
-                    self.signals.messageSignal.emit("No events found for current user in this room.", "system")
+                    self.events.message.emit("No events found for current user in this room.", "system")
+                return my_events
             else:
-                self.signals.messageSignal.emit(f"Error: {response.message}", "error")
+                self.events.message.emit(f"Error: {response.message}", "error")
         except Exception as e:
-            self.signals.messageSignal.emit(f"Error listing my events: {str(e)}", "error") 
+            self.events.message.emit(f"Error listing my events: {str(e)}", "error") 
             
     async def _fetch_room_state(self, room_id: str) -> dict:
-        
-        details = {
-            "room_id": room_id,
-            "room_name": room_id,
-            "is_space": False,
-            "power_level": "unknown",
-        }
+        """
+        Room details from the local state cache; the full state is only
+        requested from the server when the room is not cached yet. None if
+        that request failed.
+        """
+        if RoomStateCache.is_complete(room_id):
+            return RoomStateCache.room_details(room_id, self.client.user_id)
+
         try:
-            state_response = await self.client.room_get_state(room_id)
+            state_response = await asyncio.wait_for(
+                self.client.room_get_state(room_id),
+                timeout=ConfigManager.get("state_fetch_timeout", 10),
+            )
             if hasattr(state_response, "events"):
-                power_levels_content = None
-                for event in state_response.events:
-                    # Get event type.
-                    event_type = (
-                        event.get("type") if isinstance(event, dict)
-                        else getattr(event, "type", None)
-                    )
-                    if event_type == "m.room.name":
-                        content = (
-                            event.get("content") if isinstance(event, dict)
-                            else getattr(event, "content", {})
-                        )
-                        if isinstance(content, dict) and "name" in content:
-                            details["room_name"] = content.get("name")
-                    elif event_type == "m.room.create":
-                        content = (
-                            event.get("content") if isinstance(event, dict)
-                            else getattr(event, "content", {})
-                        )
-                        if isinstance(content, dict) and content.get("type") == "m.space":
-                            details["is_space"] = True
-                    elif event_type == "m.room.power_levels":
-                        power_levels_content = (
-                            event.get("content") if isinstance(event, dict)
-                            else getattr(event, "content", {})
-                        )
-                if power_levels_content:
-                    user_power = power_levels_content.get("users", {}).get(self.client.user_id)
-                    if user_power is None:
-                        user_power = power_levels_content.get("users_default", 0)
-                    details["power_level"] = user_power
+                RoomStateCache.replace(room_id, [
+                    event if isinstance(event, dict) else getattr(event, "source", {})
+                    for event in state_response.events
+                ])
+                return RoomStateCache.room_details(room_id, self.client.user_id)
+        except asyncio.TimeoutError:
+            self.events.message.emit(
+                f"Warning: Timed out fetching state for room {room_id}", "warning"
+            )
         except Exception as state_error:
-            self.signals.messageSignal.emit(
+            self.events.message.emit(
                 f"Warning: Could not fetch state for room {room_id}: {state_error}", "warning"
             )
-        return details
+        return None
+
+    @staticmethod
+    def _placeholder_details(room_id: str) -> dict:
+        """Stands in for a room whose state is not known."""
+        return {
+            "room_id": room_id,
+            "name": room_id,
+            "is_space": False,
+            "power_level": "unknown",
+            "children": [],
+        }
+
+    async def _fetch_room_states(self, room_ids):
+        """
+        Fetches the state of many rooms with at most 'state_fetch_concurrency'
+        requests in flight and yields (room ID, details or None) as soon as
+        each room resolves, in completion order.
+        """
+        semaphore = asyncio.Semaphore(max(1, ConfigManager.get("state_fetch_concurrency", 8)))
+
+        async def fetch(room_id):
+            async with semaphore:
+                return room_id, await self._fetch_room_state(room_id)
+
+        tasks = [asyncio.ensure_future(fetch(room_id)) for room_id in room_ids]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
 
     async def list_my_rooms(self):
+        """Lists the joined rooms and returns their details, or None on failure."""
         
         if not self.client or not self.client.access_token:
-            self.signals.messageSignal.emit("Cannot list rooms: Not logged in.", "warning")
+            self.events.message.emit("Cannot list rooms: Not logged in.", "warning")
             return
 
         try:
             response = await self.client.joined_rooms()
             if not hasattr(response, "rooms"):
-                self.signals.messageSignal.emit("Failed to retrieve joined rooms.", "error")
+                self.events.message.emit("Failed to retrieve joined rooms.", "error")
                 return
 
             joined_rooms = response.rooms
 
-            # Create tasks to fetch room state concurrently.
-            tasks = [self._fetch_room_state(room_id) for room_id in joined_rooms]
-            room_details_list = await asyncio.gather(*tasks)
+            room_details_list = [
+                details or self._placeholder_details(room_id)
+                async for room_id, details in self._fetch_room_states(joined_rooms)
+            ]
+            room_order = {room_id: index for index, room_id in enumerate(joined_rooms)}
+            room_details_list.sort(key=lambda details: room_order[details["room_id"]])
 
             room_list_messages = []
             for details in room_details_list:
                 type_label = "[Space]" if details["is_space"] else "[Room]"
                 entry = (
-                    f"{type_label} {details['room_name']} ({details['room_id']}) "
+                    f"{type_label} {details['name']} ({details['room_id']}) "
                     f"- Power Level: {details['power_level']}"
                 )
                 room_list_messages.append(entry)
 
             if room_list_messages:
-                for entry in room_list_messages:
-                    self.signals.messageSignal.emit(entry, "system")
+                self.events.message_batch.emit(
+                    [(entry, "system") for entry in room_list_messages]
+                )
             else:
-                self.signals.messageSignal.emit("No joined rooms found.", "system")
+                self.events.message.emit("No joined rooms found.", "system")
+            return room_details_list
 
         except Exception as e:
-            self.signals.messageSignal.emit(f"Error listing rooms: {str(e)}", "error")
+            self.events.message.emit(f"Error listing rooms: {str(e)}", "error")
 
     async def create_room(self, name: str, visibility: str = "private", is_space: bool = False):
 
         if not self.client or not self.client.access_token:
-            self.signals.messageSignal.emit(
+            self.events.message.emit(
                 "Cannot create room: Not logged in.", "warning"
             )
             return None
@@ -551,16 +1054,16 @@ class MatrixClient:
             if hasattr(response, "room_id") and response.room_id:
                 room_id = response.room_id
                 msg = f"Created {'space' if is_space else 'room'} '{name}' successfully: {room_id}"
-                self.signals.messageSignal.emit(msg, "success")
-                asyncio.create_task(self.fetch_rooms_and_spaces())
+                self.events.message.emit(msg, "success")
+                self.room_refresh.request()
                 return room_id
             else:
                 error_msg = getattr(response, "message", "Unknown error")
-                self.signals.messageSignal.emit(f"Room creation failed: {error_msg}", "error")
+                self.events.message.emit(f"Room creation failed: {error_msg}", "error")
                 return None
 
         except Exception as e:
-            self.signals.messageSignal.emit(f"Error creating room: {str(e)}", "error")
+            self.events.message.emit(f"Error creating room: {str(e)}", "error")
             return None
         
     async def leave_room(self, room_ids: str):
@@ -577,12 +1080,15 @@ class MatrixClient:
                     leave_response.transport_response.status == 200):
                     await self.client.room_forget(rid)
                     successful.append(rid)
-                    self.signals.messageSignal.emit(f"Room {rid} left.", "success")
-                    asyncio.create_task(self.fetch_rooms_and_spaces())
+                    TimelineManager.remove(rid)
+                    RoomStateCache.remove(rid)
+                    SessionStore.remove_timeline(rid)
+                    self.events.message.emit(f"Room {rid} left.", "success")
+                    self.room_refresh.request()
                 else:
-                    self.signals.messageSignal.emit(f"Failed to leave room {rid}.", "error")
+                    self.events.message.emit(f"Failed to leave room {rid}.", "error")
             except Exception as e:
-                self.signals.messageSignal.emit(f"Error leaving room {rid}: {str(e)}", "error")
+                self.events.message.emit(f"Error leaving room {rid}: {str(e)}", "error")
         
         return successful if successful else None 
 
@@ -591,16 +1097,16 @@ class MatrixClient:
         try:
             response = await self.client.join(room_id)
             if hasattr(response, "room_id") and response.room_id:
-                self.signals.messageSignal.emit(f"Accepted invite for room {room_id}.", "success")
+                self.events.message.emit(f"Accepted invite for room {room_id}.", "success")
                 if room_id in self.pending_invites:
                     del self.pending_invites[room_id]
-                asyncio.create_task(self.fetch_rooms_and_spaces())
+                self.room_refresh.request()
                 return True
             else:
-                self.signals.messageSignal.emit(f"Failed to accept invite for room {room_id}.", "error")
+                self.events.message.emit(f"Failed to accept invite for room {room_id}.", "error")
                 return False
         except Exception as e:
-            self.signals.messageSignal.emit(f"Error accepting invite for room {room_id}: {str(e)}", "error")
+            self.events.message.emit(f"Error accepting invite for room {room_id}: {str(e)}", "error")
             return False
 
     async def reject_invite(self, room_id: str):
@@ -610,50 +1116,50 @@ class MatrixClient:
             if (hasattr(response, "transport_response") and 
                 response.transport_response is not None and 
                 response.transport_response.status == 200):
-                self.signals.messageSignal.emit(f"Rejected invite for room {room_id}.", "success")
+                self.events.message.emit(f"Rejected invite for room {room_id}.", "success")
                 if room_id in self.pending_invites:
                     del self.pending_invites[room_id]
-                asyncio.create_task(self.fetch_rooms_and_spaces())
+                self.room_refresh.request()
                 return True
             else:
-                self.signals.messageSignal.emit(f"Failed to reject invite for room {room_id}.", "error")
+                self.events.message.emit(f"Failed to reject invite for room {room_id}.", "error")
                 return False
         except Exception as e:
-            self.signals.messageSignal.emit(f"Error rejecting invite for room {room_id}: {str(e)}", "error")
+            self.events.message.emit(f"Error rejecting invite for room {room_id}: {str(e)}", "error")
             return False
         
     async def invite_user(self, room_id: str, invitee_id: str):
        
         if not self.client or not self.client.access_token:
-            self.signals.messageSignal.emit("Cannot invite user: Not logged in.", "warning")
+            self.events.message.emit("Cannot invite user: Not logged in.", "warning")
             return False
         
         if not invitee_id.startswith('@'):
-            self.signals.messageSignal.emit("Invalid user ID format. User IDs should start with '@'.", "warning")
+            self.events.message.emit("Invalid user ID format. User IDs should start with '@'.", "warning")
             return False
 
         try:
             response = await self.client.room_invite(room_id, invitee_id)
             
             if hasattr(response, "event_id") and response.event_id:
-                self.signals.messageSignal.emit(
+                self.events.message.emit(
                     f"Successfully invited {invitee_id} to room {room_id}.", "success"
                 )
                 return True
             elif (hasattr(response, "transport_response") and 
                 response.transport_response is not None and 
                 response.transport_response.status == 200):
-                self.signals.messageSignal.emit(
+                self.events.message.emit(
                     f"Successfully invited {invitee_id} to room {room_id}.", "success"
                 )
                 return True
             else:
-                self.signals.messageSignal.emit(
+                self.events.message.emit(
                     f"Failed to invite {invitee_id} to room {room_id}.", "error"
                 )
                 return False
         except Exception as e:
-            self.signals.messageSignal.emit(
+            self.events.message.emit(
                 f"Error inviting {invitee_id} to room {room_id}: {str(e)}", "error"
             )
             return False  
@@ -661,10 +1167,17 @@ class MatrixClient:
     async def get_room_power_levels(self, room_id: str) -> dict:
         
         try:
-            response = await self.client.room_get_state_event(room_id, "m.room.power_levels", "")
+            content = None
+            if RoomStateCache.is_complete(room_id):
+                content = RoomStateCache.get(room_id, "m.room.power_levels")
+
+            if content is None:
+                response = await self.client.room_get_state_event(room_id, "m.room.power_levels", "")
+                if isinstance(response, nio.RoomGetStateEventResponse):
+                    content = response.content
+                    RoomStateCache.set(room_id, "m.room.power_levels", "", content)
 
-            if isinstance(response, nio.RoomGetStateEventResponse):
-                content = response.content
+            if content is not None:
                 
                 user_power = content.get("users", {}).get(
                     self.client.user_id,
@@ -679,19 +1192,19 @@ class MatrixClient:
             else:
                 
                 error_msg = f"Could not fetch m.room.power_levels: {getattr(response, 'message', 'No details')}"
-                self.signals.messageSignal.emit(error_msg, "error")
+                self.events.message.emit(error_msg, "error")
                 return
 
         except Exception as e:
             error_msg = f"Error fetching room power levels: {e}"
-            self.signals.messageSignal.emit(error_msg, "error")
+            self.events.message.emit(error_msg, "error")
             return
             
     async def update_room_power_levels(self, room_id: str, new_power_levels: dict) -> dict:
         
         try:
             
-            self.signals.messageSignal.emit(
+            self.events.message.emit(
                 f"Updating power levels: {json.dumps(new_power_levels, indent=2)}",
                 "debug"
             )
@@ -706,12 +1219,13 @@ class MatrixClient:
 
             
             if isinstance(put_response, RoomPutStateResponse):
+                RoomStateCache.set(room_id, "m.room.power_levels", "", new_power_levels)
                 success_msg = "Room power levels updated successfully."
-                self.signals.messageSignal.emit(success_msg, "system")
+                self.events.message.emit(success_msg, "system")
                 return
             else:
                 error_msg = getattr(put_response, "message", "Unknown error")
-                self.signals.messageSignal.emit(
+                self.events.message.emit(
                     f"Failed to update power levels: {error_msg}",
                     "error"
                 )
@@ -719,12 +1233,12 @@ class MatrixClient:
 
         except Exception as e:
             error_msg = f"Error updating room power levels: {e}"
-            self.signals.messageSignal.emit(error_msg, "error")
+            self.events.message.emit(error_msg, "error")
             return
         
     async def register_new_user(self, username: str, password: str) -> dict:
         try:
-            new_client = AsyncClient(self.homeserver)
+            new_client = InstrumentedAsyncClient(self.homeserver)
             
             register_resp = await asyncio.wait_for(
                 new_client.register(username=username, password=password), 
@@ -738,7 +1252,7 @@ class MatrixClient:
 
         except asyncio.TimeoutError:
             error_msg = "The registration process timed out."
-            self.signals.messageSignal.emit(error_msg, "error")
+            self.events.message.emit(error_msg, "error")
             await new_client.close()
             return {
                 "status": "error",
@@ -746,7 +1260,7 @@ class MatrixClient:
             }
 
         except Exception as e:
-            self.signals.messageSignal.emit(f"Error registering new user: {e}", "error")
+            self.events.message.emit(f"Error registering new user: {e}", "error")
             return {
                 "status": "error",
                 "message": str(e)
@@ -772,38 +1286,40 @@ class MatrixClient:
             )
 
             if hasattr(response, "event_id") and response.event_id:
-                self.signals.messageSignal.emit(
+                self.events.message.emit(
                     f"Added child '{child_id}' to space '{parent_id}' successfully.",
                     "success"
                 )
-                asyncio.create_task(self.fetch_rooms_and_spaces())
+                RoomStateCache.set(parent_id, "m.space.child", child_id, content)
+                SpaceGraph.invalidate(parent_id)
+                self.room_refresh.request()
                 return True
 
             if (isinstance(response, nio.RoomPutStateResponse) 
                 or (hasattr(response, "transport_response") 
                     and response.transport_response is not None 
                     and response.transport_response.status == 200)):
-                self.signals.messageSignal.emit(
+                self.events.message.emit(
                     f"Added child '{child_id}' to space '{parent_id}' successfully.",
                     "success"
                 )
-                asyncio.create_task(self.fetch_rooms_and_spaces())
+                RoomStateCache.set(parent_id, "m.space.child", child_id, content)
+                SpaceGraph.invalidate(parent_id)
+                self.room_refresh.request()
                 return True
 
             error_msg = getattr(response, "message", "Unknown error")
-            self.signals.messageSignal.emit(
+            self.events.message.emit(
                 f"Failed to add child '{child_id}' to space '{parent_id}': {error_msg}",
                 "error"
             )
-            asyncio.create_task(self.fetch_rooms_and_spaces())
             return False
 
         except Exception as e:
-            self.signals.messageSignal.emit(
+            self.events.message.emit(
                 f"Error adding child '{child_id}' to space '{parent_id}': {str(e)}",
                 "error"
             )
-            asyncio.create_task(self.fetch_rooms_and_spaces())
             return False
         
     async def remove_child_from_space(self, child_id: str, parent_id: str) -> bool:
@@ -818,11 +1334,13 @@ class MatrixClient:
             )
 
             if hasattr(response, "event_id") and response.event_id:
-                self.signals.messageSignal.emit(
+                self.events.message.emit(
                     f"Removed child '{child_id}' from space '{parent_id}' successfully.",
                     "success"
                 )
-                asyncio.create_task(self.fetch_rooms_and_spaces())
+                RoomStateCache.set(parent_id, "m.space.child", child_id, {})
+                SpaceGraph.invalidate(parent_id)
+                self.room_refresh.request()
                 return True
 
             if (
@@ -833,28 +1351,28 @@ class MatrixClient:
                     response.transport_response.status == 200
                 )
             ):
-                self.signals.messageSignal.emit(
+                self.events.message.emit(
                     f"Removed child '{child_id}' from space '{parent_id}' successfully.",
                     "success"
                 )
-                asyncio.create_task(self.fetch_rooms_and_spaces())
+                RoomStateCache.set(parent_id, "m.space.child", child_id, {})
+                SpaceGraph.invalidate(parent_id)
+                self.room_refresh.request()
                 return True
 
      
             error_msg = getattr(response, "message", "Unknown error")
-            self.signals.messageSignal.emit(
+            self.events.message.emit(
                 f"Failed to remove child '{child_id}' from space '{parent_id}': {error_msg}",
                 "error"
             )
-            asyncio.create_task(self.fetch_rooms_and_spaces())
             return False
 
         except Exception as e:
-            self.signals.messageSignal.emit(
+            self.events.message.emit(
                 f"Error removing child '{child_id}' from space '{parent_id}': {str(e)}",
                 "error"
             )
-            asyncio.create_task(self.fetch_rooms_and_spaces())
             return False    
 
     async def current_room_id(self):
@@ -863,4 +1381,6 @@ class MatrixClient:
     
     async def stop(self):
         await self.stop_syncing()
+        self.room_refresh.cancel()
+        SessionStore.save(force=True, wait=True)
         await self.client.close()
\ No newline at end of file
@@ -0,0 +1,18 @@
+from UTILS.signals import SignalManager
+
+from CORE.client_events import ClientEvents
+
+
+def bridge_client_events(events: ClientEvents, signals: SignalManager):
+    """
+    Forwards the events of a MatrixClient to the Qt signals the UI listens
+    to. Both run on the qasync loop thread, so no queuing is needed.
+    """
+    events.message.connect(signals.messageSignal.emit)
+    events.message_batch.connect(signals.messageBatchSignal.emit)
+    events.rooms.connect(signals.roomSignal.emit)
+    events.room_patch.connect(signals.roomPatchSignal.emit)
+    events.logout.connect(signals.logoutSignal.emit)
+    events.timeline.connect(signals.timelineSignal.emit)
+    events.timeline_reset.connect(signals.timelineResetSignal.emit)
+    events.history.connect(signals.historySignal.emit)
@@ -0,0 +1,48 @@
+import asyncio
+
+
+class RefreshScheduler:
+    """
+    Runs an expensive refresh coroutine on request, debounced and single-flight:
+
+    - requests arriving within 'delay' seconds of each other collapse into one run,
+    - at most one run is in progress at any time,
+    - any number of requests made during a run result in exactly one follow-up run.
+    """
+
+    def __init__(self, refresh, delay: float = 0.3):
+        self._refresh = refresh
+        self.delay = delay
+        self._task = None
+        self._pending = False
+        self._last_request = 0.0
+
+    def request(self):
+        loop = asyncio.get_event_loop()
+        self._pending = True
+        self._last_request = loop.time()
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+
+        while self._pending:
+            # Wait until a full window has passed without a new request.
+            wait = self._last_request + self.delay - loop.time()
+            while wait > 0:
+                await asyncio.sleep(wait)
+                wait = self._last_request + self.delay - loop.time()
+
+            self._pending = False
+            await self._refresh()
+
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def cancel(self):
+        self._pending = False
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
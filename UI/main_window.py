@@ -3,33 +3,37 @@
 from PySide6.QtWidgets import (
     QMainWindow,
     QTextEdit,
+    QPlainTextEdit,
     QVBoxLayout,
     QWidget,
     QHBoxLayout,
     QSplitter,
-    QTreeWidget,
-    QTreeWidgetItem,
+    QTreeView,
+    QListView,
+    QAbstractItemView,
 )
 
-from PySide6.QtCore import Qt, QPoint, QEvent
+from PySide6.QtCore import Qt, QPoint, QEvent, QTimer
 from PySide6.QtGui import QTextCursor, QKeySequence, QGuiApplication
-from PySide6.QtWebEngineWidgets import QWebEngineView
 
 from UTILS.signals import SignalManager
 from UTILS.color_manager import ColorManager
+from UTILS.event_formatter import EventFormatter
 from UTILS.config_manager import ConfigManager
 from UTILS.open_room_manager import OpenRoomManager
+from UI.room_tree_model import RoomTreeModel
+from UI.timeline_model import TimelineModel
 
 import asyncio
 
 class MainWindow(QMainWindow):
-    def __init__(self, matrix_client, ui_scale=1.0):
+    def __init__(self, matrix_client, ui_scale=None):
         super().__init__()
         self.setWindowTitle("Fastliner") 
 
         self.matrix_client = matrix_client
 
-        self.ui_scale = ui_scale
+        self.ui_scale = ui_scale if ui_scale is not None else ConfigManager.get("ui_scale", 1.0)
 
         self.sanitize_paste = True # This setting intercepts rich text injection into the input field.
 
@@ -37,7 +41,99 @@ class MainWindow(QMainWindow):
         self.setAttribute(Qt.WA_TranslucentBackground, True)
         self.resize(750, 500)
 
-        placeholder_text = ConfigManager.get("input_placeholder", "~")
+        self.central_widget = QWidget()
+        self.central_widget.setObjectName("CentralWidget")
+
+        # Sidebar
+        self.sidebar = QWidget()
+        self.sidebar.setVisible(False)
+        self.sidebar.setObjectName("Sidebar")
+
+        self.room_model = RoomTreeModel(self)
+        self.tree = QTreeView(self.sidebar)
+        self.tree.setModel(self.room_model)
+        self.tree.setHeaderHidden(True)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setIndentation(15)
+        self.tree.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.tree.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+
+        sidebar_layout = QVBoxLayout(self.sidebar)
+        sidebar_layout.addWidget(self.tree)
+        sidebar_layout.setContentsMargins(0, 0, 0, 0)
+        self.sidebar.setLayout(sidebar_layout)
+
+        # CallWidget: QtWebEngine is only loaded the first time /web opens it.
+        self.callwidget = None
+        self.web_profile = None
+
+        # I/O Container: Wraps CLI Widget + Input Field
+        self.io_container = QWidget()
+        self.io_container.setObjectName("IOContainer")
+
+        io_layout = QVBoxLayout(self.io_container)
+        io_layout.setSpacing(0)
+        io_layout.setContentsMargins(0, 0, 0, 0)
+
+        # Timeline of the open room; only the visible rows are painted.
+        self.timeline_model = TimelineModel(EventFormatter.format_events, self)
+        self.timeline_view = QListView()
+        self.timeline_view.setModel(self.timeline_model)
+        self.timeline_view.setVisible(False)
+        self.timeline_view.setWordWrap(True)
+        self.timeline_view.setLayoutMode(QListView.Batched)
+        self.timeline_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.timeline_view.setFocusPolicy(Qt.NoFocus)
+        self.timeline_view.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.timeline_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+
+        # CLI text area
+        self.cli_widget = QPlainTextEdit()
+        self.cli_widget.setReadOnly(True)
+        self.cli_widget.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.cli_widget.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+
+        # Input field
+        self.input_field = QTextEdit()
+        self.input_field.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.input_field.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        initial_height = int(30 * self.ui_scale)
+        self.input_field.setFixedHeight(initial_height)
+        self.input_field.textChanged.connect(self.adjust_input_height)
+        self.input_field.installEventFilter(self)
+
+        io_layout.addWidget(self.timeline_view, 3)
+        io_layout.addWidget(self.cli_widget, 1)
+        io_layout.addWidget(self.input_field)
+
+        self.splitter = QSplitter(Qt.Horizontal)
+        self.splitter.addWidget(self.sidebar)
+        self.splitter.addWidget(self.io_container)
+        self.splitter.setSizes([0, 1])
+        self.splitter.setHandleWidth(0)
+
+        self.layout = QHBoxLayout(self.central_widget)
+        self.layout.setSpacing(0)
+        self.layout.addWidget(self.splitter)
+        
+        self.central_widget.setLayout(self.layout)
+        self.setCentralWidget(self.central_widget)
+
+        self.apply_styles()
+        self.apply_config()
+
+        self.signals = SignalManager()
+        self.setup_connections()
+
+        self._drag_pos = QPoint()
+
+    def apply_styles(self, *_):
+        """
+        (Re)builds the stylesheets from the current colors, e.g. after the
+        config changed; the window does not need to be recreated.
+        """
+        ui_scale = self.ui_scale
+
         colors_config = ConfigManager.get("colors", {})
         sidebar_splitter_color = colors_config.get("sidebar_splitter_color", "#282828")
         sidebar_color = colors_config.get("sidebar_color", "255, 255, 255, 1")
@@ -61,9 +157,6 @@ class MainWindow(QMainWindow):
         input_color = colors_config.get("input_field_color", "255, 255, 255, 1")
         app_color = colors_config.get("central_widget_color", "255, 255, 255, 0.5")
 
-        self.central_widget = QWidget()
-        self.central_widget.setObjectName("CentralWidget")
-
         scaled_radius = int(5 * ui_scale)
         scaled_radius_sharp = int(0 * ui_scale)
 
@@ -75,10 +168,6 @@ class MainWindow(QMainWindow):
             }}
         """)
 
-        # Sidebar
-        self.sidebar = QWidget()
-        self.sidebar.setVisible(False)
-        self.sidebar.setObjectName("Sidebar")
         self.sidebar.setStyleSheet(f"""
             QWidget#Sidebar {{
                 background-color: rgba({sidebar_color});
@@ -88,11 +177,8 @@ class MainWindow(QMainWindow):
             }}
         """)
 
-        self.tree = QTreeWidget(self.sidebar)
-        self.tree.setHeaderHidden(True)
-        self.tree.setIndentation(15)
         self.tree.setStyleSheet(f"""
-            QTreeWidget {{
+            QTreeView {{
                 background-color: rgba({tree_background_color});
                 color: {tree_color};
                 border: none;
@@ -100,11 +186,11 @@ class MainWindow(QMainWindow):
                 border-bottom-left-radius: {scaled_radius}px;
                 padding: 5px;
             }}
-            QTreeWidget::item {{
+            QTreeView::item {{
                 color: {tree_item_color};
                 padding: 5px;
             }}
-            QTreeWidget::item:selected {{
+            QTreeView::item:selected {{
                 background-color: rgba({tree_item_selected_color});
                 border-radius: 5px;
             }}
@@ -114,7 +200,7 @@ class MainWindow(QMainWindow):
             QTreeView::branch:open:has-children{{
                 background-color: rgba({tree_category_icon_color_open});
             }}
-            QTreeWidget::item:hover {{
+            QTreeView::item:hover {{
                 background-color: rgba({tree_item_hover_color});
             }}
             QTreeView::branch:selected {{
@@ -124,38 +210,25 @@ class MainWindow(QMainWindow):
                 background-color: rgba({tree_category_indentation_color});
             }}
         """)
-        self.tree.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.tree.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
 
-        sidebar_layout = QVBoxLayout(self.sidebar)
-        sidebar_layout.addWidget(self.tree)
-        sidebar_layout.setContentsMargins(0, 0, 0, 0)
-        self.sidebar.setLayout(sidebar_layout)
+        if self.callwidget is not None:
+            self.callwidget.setStyleSheet(f"""
+                QWidget#CallWidget {{
+                    background-color: rgba({sidebar_color});
+                    border: 1px solid {sidebar_border_color};
+                    border-top-right-radius: {scaled_radius}px;
+                    border-bottom-right-radius: {scaled_radius}px;
+                }}
+            """)
 
-        # CallWidget
-        self.callwidget = QWebEngineView()
-        self.callwidget.setVisible(False)
-        self.callwidget.setObjectName("CallWidget")
-        self.callwidget.setStyleSheet(f"""
-            QWidget#CallWidget {{
-                background-color: rgba({sidebar_color});
-                border: 1px solid {sidebar_border_color};
-                border-top-right-radius: {scaled_radius}px;
-                border-bottom-right-radius: {scaled_radius}px;
-            }}
+        self.timeline_view.setStyleSheet(f"""
+            color: {default_color};
+            background-color: rgba({display_color});
+            border: 1px solid {display_border_color};
+            border-radius: {scaled_radius}px;
+            padding: {int(5 * ui_scale)}px;
         """)
 
-        # I/O Container: Wraps CLI Widget + Input Field
-        self.io_container = QWidget()
-        self.io_container.setObjectName("IOContainer")
-
-        io_layout = QVBoxLayout(self.io_container)
-        io_layout.setSpacing(0)
-        io_layout.setContentsMargins(0, 0, 0, 0)
-
-        # CLI text area
-        self.cli_widget = QTextEdit()
-        self.cli_widget.setReadOnly(True)
         self.cli_widget.setStyleSheet(f"""
             color: {default_color};
             background-color: rgba({display_color});
@@ -165,11 +238,7 @@ class MainWindow(QMainWindow):
             border-bottom-right-radius: {scaled_radius_sharp}px;
             padding: {int(5 * ui_scale)}px;
         """)
-        self.cli_widget.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.cli_widget.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
 
-        # Input field
-        self.input_field = QTextEdit()
         self.input_field.setStyleSheet(f"""
             background-color: rgba({input_color});
             color: {default_color};
@@ -179,57 +248,157 @@ class MainWindow(QMainWindow):
             border-top-left-radius: {scaled_radius_sharp}px;
             border-top-right-radius: {scaled_radius_sharp}px;
         """)
-        self.input_field.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.input_field.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        initial_height = int(30 * self.ui_scale)
-        self.input_field.setFixedHeight(initial_height)
-        self.input_field.textChanged.connect(self.adjust_input_height)
-        self.input_field.setPlaceholderText(placeholder_text)
-        self.input_field.installEventFilter(self)
 
-        io_layout.addWidget(self.cli_widget)
-        io_layout.addWidget(self.input_field)
-
-        self.splitter = QSplitter(Qt.Horizontal)
-        self.splitter.addWidget(self.sidebar)
-        self.splitter.addWidget(self.io_container)
-        self.splitter.addWidget(self.callwidget)
-        self.splitter.setSizes([0, 1])
         self.splitter.setStyleSheet(f"""
             QSplitter::handle {{
                 background: transparent;
                 border: 1px solid {sidebar_splitter_color};
             }}
         """)
-        self.splitter.setHandleWidth(0)
 
-        self.layout = QHBoxLayout(self.central_widget)
-        self.layout.setSpacing(0)
-        self.layout.addWidget(self.splitter)
-        
-        self.central_widget.setLayout(self.layout)
-        self.setCentralWidget(self.central_widget)
+        # Sharp inner corners next to the open side panels.
+        if not self.sidebar.isHidden():
+            self.cli_widget.setStyleSheet(self.cli_widget.styleSheet() + f"""
+                border-top-left-radius: {scaled_radius_sharp}px;
+            """)
+            self.input_field.setStyleSheet(self.input_field.styleSheet() + f"""
+                border-bottom-left-radius: {scaled_radius_sharp}px;
+            """)
+        if self.callwidget is not None and not self.callwidget.isHidden():
+            self.cli_widget.setStyleSheet(self.cli_widget.styleSheet() + f"""
+                border-top-right-radius: {scaled_radius_sharp}px;
+            """)
+            self.input_field.setStyleSheet(self.input_field.styleSheet() + f"""
+                border-bottom-right-radius: {scaled_radius_sharp}px;
+            """)
 
-        self.signals = SignalManager()
-        self.setup_connections()
+        # Rows take their colors from ColorManager when painted.
+        self.timeline_view.viewport().update()
 
-        self._drag_pos = QPoint()
+    def apply_config(self, *_):
+        """Applies the non-color settings that can change at runtime."""
+
+        self.input_field.setPlaceholderText(ConfigManager.get("input_placeholder", "~"))
+        # Oldest lines are dropped once the scrollback is full.
+        self.cli_widget.document().setMaximumBlockCount(max(0, int(ConfigManager.get("scrollback_lines", 5000))))
+
+    def apply_scale(self, *_):
+        """Resizes the radii, paddings and input field to a new 'ui_scale'."""
+
+        self.ui_scale = ConfigManager.get("ui_scale", 1.0)
+        self.input_field.setFixedHeight(int(30 * self.ui_scale))
+        self.apply_styles()
+        self.adjust_input_height()
 
     def setup_connections(self):
         self.signals.messageSignal.connect(self.append_text)
+        self.signals.messageBatchSignal.connect(self.append_lines)
         self.signals.roomSignal.connect(self.populate_sidebar)
-        self.tree.itemClicked.connect(self.on_item_clicked)
+        self.signals.roomPatchSignal.connect(self.apply_room_patch)
+        self.tree.clicked.connect(self.on_item_clicked)
+        self.room_model.childrenRequested.connect(self.on_children_requested)
         self.signals.logoutSignal.connect(self.logout_clear_and_reset_action)
         self.signals.blankSignal.connect(self.blank_action)
+        self.signals.timelineResetSignal.connect(self.show_timeline)
+        self.signals.timelineSignal.connect(self.append_timeline)
+        self.signals.historySignal.connect(self.prepend_timeline)
+        self.timeline_view.verticalScrollBar().valueChanged.connect(self.on_timeline_scrolled)
+        ConfigManager.subscribe("colors", self.apply_styles)
+        ConfigManager.subscribe("input_placeholder", self.apply_config)
+        ConfigManager.subscribe("scrollback_lines", self.apply_config)
+        ConfigManager.subscribe("ui_scale", self.apply_scale)
 
     def append_text(self, text: str, role: str = None):
 
-        cursor = self.cli_widget.textCursor()
+        self.append_lines([(text, role)])
+
+    def append_lines(self, lines: list):
+        """
+        Appends a batch of (text, role) lines as one document edit. Each line
+        becomes its own text block so the scrollback cap can drop old lines,
+        and text is inserted with a char format instead of parsed HTML.
+        """
+        if not lines:
+            return
+
+        scrollbar = self.cli_widget.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+
+        document = self.cli_widget.document()
+        cursor = QTextCursor(document)
         cursor.movePosition(QTextCursor.End)
-        self.cli_widget.setTextCursor(cursor)
+        cursor.beginEditBlock()
+
+        first = document.isEmpty()
+        for text, role in lines:
+            char_format = ColorManager.char_format(role)
+            for line in text.split("\n"):
+                if not first:
+                    cursor.insertBlock()
+                first = False
+                cursor.insertText(line, char_format)
+
+        cursor.endEditBlock()
+
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def show_timeline(self, room_id: str, events: list, prev_batch):
+
+        if room_id != OpenRoomManager.get_current_room():
+            return
+        self.timeline_model.reset_room(room_id, events, prev_batch)
+        self.timeline_view.setVisible(True)
+        self.timeline_view.scrollToBottom()
+        QTimer.singleShot(0, self.load_older_if_needed)
+
+    def append_timeline(self, room_id: str, events: list):
+
+        scrollbar = self.timeline_view.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+        self.timeline_model.append_events(room_id, events)
+        if at_bottom:
+            self.timeline_view.scrollToBottom()
+
+    def prepend_timeline(self, room_id: str, events: list, prev_batch):
+
+        # Keep the row at the top of the view in place while rows are
+        # inserted above it.
+        top = self.timeline_view.indexAt(self.timeline_view.viewport().rect().topLeft())
+        advanced = bool(events) and prev_batch != self.timeline_model.prev_batch
+        self.timeline_model.prepend_events(room_id, events, prev_batch)
+        if events and top.isValid():
+            anchor = self.timeline_model.index(top.row() + len(events))
+            self.timeline_view.scrollTo(anchor, QAbstractItemView.PositionAtTop)
+        # A failed page comes back empty with the same token; paging again at
+        # once would loop while offline, so that waits for the user to scroll.
+        if advanced:
+            QTimer.singleShot(0, self.load_older_if_needed)
 
-        colorized_html = ColorManager.colorize(text, role=role)
-        self.cli_widget.insertHtml(colorized_html + "<br>")
+    def on_timeline_scrolled(self, value):
+
+        if value == self.timeline_view.verticalScrollBar().minimum():
+            self.load_older_messages()
+
+    def load_older_if_needed(self):
+        """Pages in history until the view is filled or the room start is reached."""
+
+        if self.timeline_view.isVisible() and self.timeline_view.verticalScrollBar().maximum() == 0:
+            self.load_older_messages()
+
+    def load_older_messages(self):
+
+        if not self.timeline_model.can_load_older():
+            return
+        self.timeline_model.loading = True
+        asyncio.create_task(self.matrix_client.load_older_messages(
+            self.timeline_model.room_id, self.timeline_model.prev_batch
+        ))
+
+    def hide_timeline(self):
+
+        self.timeline_model.clear()
+        self.timeline_view.setVisible(False)
 
     def handle_user_input(self):
 
@@ -303,13 +472,42 @@ class MainWindow(QMainWindow):
             ))
             self.sidebar.setVisible(False)      
 
+    def create_callwidget(self):
+        """
+        Creates the web panel, importing QtWebEngine on first use so the
+        Chromium engine is not loaded by sessions that never open it.
+        """
+        from UI.web_panel import WebPanel, create_profile
+
+        if self.web_profile is None:
+            self.web_profile = create_profile(self)
+        self.callwidget = WebPanel(self.web_profile)
+        self.callwidget.setVisible(False)
+        self.callwidget.setObjectName("CallWidget")
+        self.splitter.addWidget(self.callwidget)
+        self.apply_styles()
+
+    def destroy_callwidget(self):
+        """Deletes the web panel along with its page and renderer process."""
+
+        if self.callwidget is None:
+            return
+        callwidget = self.callwidget
+        self.callwidget = None
+        callwidget.setVisible(False)
+        callwidget.setParent(None)
+        callwidget.deleteLater()
+
     def toggle_callwidget(self):
     
         scaled_radius_sharp = int(0 * self.ui_scale)
 
         sizes = self.splitter.sizes()
 
-        if sizes[2] == 0:
+        if self.callwidget is None or self.callwidget.isHidden():
+            if self.callwidget is None:
+                self.create_callwidget()
+                sizes = self.splitter.sizes()
             self.splitter.setSizes([sizes[0], sizes[1], 500])
             self.cli_widget.setStyleSheet(self.cli_widget.styleSheet() + f"""
                 border-top-right-radius: {scaled_radius_sharp}px;
@@ -317,8 +515,7 @@ class MainWindow(QMainWindow):
             self.input_field.setStyleSheet(self.input_field.styleSheet() + f"""
                 border-bottom-right-radius: {scaled_radius_sharp}px;
             """)
-            self.callwidget.setUrl("https://www.google.com")
-            self.callwidget.setVisible(True)
+            self.callwidget.show_page()
         else:
             self.splitter.setSizes([sizes[0], sizes[1], 0])
             self.cli_widget.setStyleSheet(self.cli_widget.styleSheet().replace(
@@ -327,48 +524,39 @@ class MainWindow(QMainWindow):
             self.input_field.setStyleSheet(self.input_field.styleSheet().replace(
                 f"border-bottom-right-radius: {scaled_radius_sharp}px;", ""
             ))
-            self.callwidget.setVisible(False)  
-            self.callwidget.setUrl("about:blank")
-            self.callwidget.page().profile().clearHttpCache()     
+            close_action = ConfigManager.get("web_close_action", "destroy")
+            if close_action == "destroy":
+                self.destroy_callwidget()
+            else:
+                self.callwidget.hide_page(close_action)
 
     def populate_sidebar(self, room_details):
-      
-        self.tree.clear()
+        """Replaces the room list; only the rows that changed are touched."""
 
-        spaces = {}
-        standalone_rooms = []
+        self.room_model.set_rooms(room_details)
 
-        for room in room_details:
-            if room.get("is_space"):
-                spaces[room["room_id"]] = room
-            else:
-                standalone_rooms.append(room)
+    def apply_room_patch(self, patch: dict):
+        """
+        Applies a partial room list update:
+        {"upsert": [room, ...], "remove": [room_id, ...]}.
+        """
+        self.room_model.apply_patch(patch)
 
-        for space_id, space in spaces.items():
-            
-            display_name = space.get("name", space_id)
-            space_item = QTreeWidgetItem(self.tree, [f"─ {display_name}"])
-            
-            space_item.setData(0, Qt.UserRole, space_id)
-
-            children = space.get("children", [])
-            for child in children:
-                child_display_name = child.get("name", child.get("room_id", "Unknown"))
-                child_item = QTreeWidgetItem(space_item, [f"└ {child_display_name}"])
-                
-                child_item.setData(0, Qt.UserRole, child.get("room_id"))
-            space_item.setExpanded(True)
-        
-        for room in standalone_rooms:
-            display_name = room.get("name", room.get("room_id"))
-            room_item = QTreeWidgetItem(self.tree, [display_name])
-            room_item.setData(0, Qt.UserRole, room.get("room_id"))
+    def set_sidebar_filter(self, text: str):
+        """Shows only the joined rooms whose name or ID contains 'text'."""
+
+        self.room_model.set_filter(text)
+        if text and not self.sidebar.isVisible():
+            self.toggle_sidebar()
+
+    def on_children_requested(self, space_id):
 
-        self.tree.repaint()
+        # Not known yet; the sidebar is updated once they are fetched.
+        asyncio.create_task(self.matrix_client.expand_space(space_id))
 
-    def on_item_clicked(self, item, column):
+    def on_item_clicked(self, index):
        
-        room_id = item.data(0, Qt.UserRole)
+        room_id = index.data(Qt.UserRole)
         if room_id:
             
             if OpenRoomManager.get_current_room() == room_id:
@@ -378,18 +566,19 @@ class MainWindow(QMainWindow):
             OpenRoomManager.set_current_room(room_id)
 
             self.cli_widget.clear()
-            self.signals.messageSignal.emit(f"Fetching context for room: {room_id}", "system")
-            asyncio.create_task(self.matrix_client.fetch_room_messages(room_id))
+            asyncio.create_task(self.matrix_client.open_room(room_id))
         else:
             self.signals.messageSignal.emit("No room id found for the selected item.", "error")   
 
     def blank_action(self):
         OpenRoomManager.reset_current_room()
+        self.hide_timeline()
         self.cli_widget.clear()       
         self.signals.messageSignal.emit("Deselected room", "system")
 
     def logout_clear_and_reset_action(self):
         OpenRoomManager.reset_current_room()
+        self.hide_timeline()
         self.cli_widget.clear()
         self.input_field.clear()             
 
@@ -399,6 +588,6 @@ class MainWindow(QMainWindow):
         asyncio.create_task(self.cleanup())
 
     async def cleanup(self):
-        global matrix_client
-        if matrix_client:
-            await matrix_client.stop()
\ No newline at end of file
+        self.destroy_callwidget()
+        if self.matrix_client:
+            await self.matrix_client.stop()
\ No newline at end of file
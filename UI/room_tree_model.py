@@ -0,0 +1,274 @@
+# room_tree_model.py
+
+from PySide6.QtCore import QAbstractItemModel, QModelIndex, Qt, Signal
+
+
+class RoomEntry:
+    """Compact index entry of one room or space."""
+    __slots__ = ("room_id", "name", "is_space", "joined", "children")
+
+    def __init__(self, room: dict):
+        self.room_id = room["room_id"]
+        self.name = room.get("name") or self.room_id
+        self.is_space = bool(room.get("is_space"))
+        self.joined = room.get("joined", True)
+        # None: children not known yet, [] : no children.
+        self.children = room.get("children") if self.is_space else []
+
+
+class TreeNode:
+    """
+    One row of the tree. A room can appear in several places (top-level and
+    under any number of spaces), so rows are separate from index entries.
+    'children' stays None until the row is first expanded.
+    """
+    __slots__ = ("room_id", "parent", "children", "row", "requested")
+
+    def __init__(self, room_id, parent, row=0):
+        self.room_id = room_id
+        self.parent = parent
+        self.children = None
+        self.row = row
+        self.requested = False
+
+    def ancestors(self):
+        node = self.parent
+        while node is not None and node.room_id is not None:
+            yield node.room_id
+            node = node.parent
+
+
+class RoomTreeModel(QAbstractItemModel):
+    """
+    Sidebar model over a compact room index. Only top-level rows exist up
+    front; children of spaces are created when the view first expands them,
+    and the view only paints the visible rows.
+    """
+
+    # Emitted when a space is expanded whose children are not known yet.
+    childrenRequested = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rooms = {}
+        self.changed = set()
+        self.filter_text = ""
+        self.root = TreeNode(None, None)
+        self.root.children = []
+
+    # Index bookkeeping
+
+    def _node(self, index):
+        return index.internalPointer() if index.isValid() else self.root
+
+    def _index_of(self, node):
+        if node is self.root:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node)
+
+    def index(self, row, column, parent=QModelIndex()):
+        node = self._node(parent)
+        if column != 0 or node.children is None or not 0 <= row < len(node.children):
+            return QModelIndex()
+        return self.createIndex(row, 0, node.children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        return self._index_of(index.internalPointer().parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        node = self._node(parent)
+        return len(node.children) if node.children is not None else 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self._node(parent)
+        if node.children is not None:
+            return bool(node.children)
+        entry = self.rooms.get(node.room_id)
+        return bool(entry and entry.is_space and entry.children != [])
+
+    def canFetchMore(self, parent):
+        node = self._node(parent)
+        return node.children is None and self.hasChildren(parent)
+
+    def fetchMore(self, parent):
+        node = self._node(parent)
+        entry = self.rooms.get(node.room_id)
+        if entry is None or node.children is not None:
+            return
+
+        if entry.children is None:
+            if not node.requested:
+                node.requested = True
+                self.childrenRequested.emit(node.room_id)
+            return
+
+        child_ids = self._child_ids(node)
+        if not child_ids:
+            node.children = []
+            return
+        self.beginInsertRows(parent, 0, len(child_ids) - 1)
+        node.children = [TreeNode(child_id, node, row) for row, child_id in enumerate(child_ids)]
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+
+        if role == Qt.DisplayRole:
+            entry = self.rooms.get(node.room_id)
+            name = entry.name if entry else node.room_id
+            if node.parent is not self.root:
+                return f"└ {name}"
+            if entry and entry.is_space:
+                return f"─ {name}"
+            return name
+        if role == Qt.UserRole:
+            return node.room_id
+        return None
+
+    # Room list updates
+
+    def set_rooms(self, room_details: list):
+        previous = self.rooms
+        self.rooms = {room["room_id"]: RoomEntry(room) for room in room_details}
+        self.changed = {
+            room_id for room_id, entry in self.rooms.items()
+            if room_id not in previous or previous[room_id].name != entry.name
+            or previous[room_id].is_space != entry.is_space
+        }
+        self._sync()
+
+    def apply_patch(self, patch: dict):
+        for room_id in patch.get("remove", []):
+            self.rooms.pop(room_id, None)
+        for room in patch.get("upsert", []):
+            self.rooms[room["room_id"]] = RoomEntry(room)
+        self.changed = {room["room_id"] for room in patch.get("upsert", [])}
+        self._sync()
+
+    def set_filter(self, text: str):
+        self.filter_text = text.strip().lower()
+        self._sync()
+
+    def _matches(self, entry):
+        return self.filter_text in entry.name.lower() or self.filter_text in entry.room_id.lower()
+
+    def _top_level_ids(self):
+        joined = [entry for entry in self.rooms.values() if entry.joined]
+
+        if self.filter_text:
+            return [entry.room_id for entry in joined if self._matches(entry)]
+
+        joined_spaces = [entry.room_id for entry in joined if entry.is_space]
+
+        # Spaces nested in another joined space are drawn under it. When
+        # spaces only contain each other, the first of them becomes top-level.
+        nested = set()
+        for space_id in joined_spaces:
+            for child_id in self.rooms[space_id].children or []:
+                if child_id != space_id:
+                    nested.add(child_id)
+
+        top_level = []
+        reachable = set()
+        candidates = [space_id for space_id in joined_spaces if space_id not in nested]
+        candidates += [space_id for space_id in joined_spaces if space_id in nested]
+        for space_id in candidates:
+            if space_id in reachable:
+                continue
+            top_level.append(space_id)
+            reachable.add(space_id)
+            pending = [space_id]
+            while pending:
+                entry = self.rooms.get(pending.pop())
+                for child_id in (entry.children if entry else None) or []:
+                    if child_id not in reachable:
+                        reachable.add(child_id)
+                        pending.append(child_id)
+
+        return top_level + [entry.room_id for entry in joined if not entry.is_space]
+
+    def _child_ids(self, node):
+        entry = self.rooms.get(node.room_id)
+        if entry is None or not entry.is_space or not entry.children:
+            return []
+        ancestors = set(node.ancestors()) | {node.room_id}
+        return [child_id for child_id in entry.children if child_id not in ancestors]
+
+    def _sync(self):
+        self._sync_children(self.root, self._top_level_ids())
+        self.changed = set()
+
+    @staticmethod
+    def _renumber(node, start=0):
+        for row in range(start, len(node.children)):
+            node.children[row].row = row
+
+    def _sync_children(self, node, desired):
+        """
+        Makes the rows under 'node' match 'desired' room IDs with the
+        smallest set of row removals, moves and insertions, so the view
+        keeps its expansion and selection.
+        """
+        parent_index = self._index_of(node)
+
+        if not node.children:
+            if desired:
+                self.beginInsertRows(parent_index, 0, len(desired) - 1)
+                node.children = [TreeNode(room_id, node, row) for row, room_id in enumerate(desired)]
+                self.endInsertRows()
+            return
+
+        wanted = set(desired)
+
+        seen = set()
+        for row in reversed(range(len(node.children))):
+            room_id = node.children[row].room_id
+            if room_id not in wanted or room_id in seen:
+                self.beginRemoveRows(parent_index, row, row)
+                del node.children[row]
+                self._renumber(node, row)
+                self.endRemoveRows()
+            else:
+                seen.add(room_id)
+
+        for row, room_id in enumerate(desired):
+            current = node.children[row] if row < len(node.children) else None
+            if current is not None and current.room_id == room_id:
+                self._refresh_node(current, row, parent_index)
+                continue
+
+            source_row = next(
+                (r for r in range(row + 1, len(node.children)) if node.children[r].room_id == room_id),
+                None,
+            )
+            if source_row is not None:
+                self.beginMoveRows(parent_index, source_row, source_row, parent_index, row)
+                node.children.insert(row, node.children.pop(source_row))
+                self._renumber(node, row)
+                self.endMoveRows()
+                self._refresh_node(node.children[row], row, parent_index)
+            else:
+                self.beginInsertRows(parent_index, row, row)
+                node.children.insert(row, TreeNode(room_id, node, row))
+                self._renumber(node, row)
+                self.endInsertRows()
+
+    def _refresh_node(self, node, row, parent_index):
+        index = self.index(row, 0, parent_index)
+        if node.room_id in self.changed:
+            self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+        if node.children is not None:
+            self._sync_children(node, self._child_ids(node))
+        elif node.requested and self.rooms.get(node.room_id) and self.rooms[node.room_id].children is not None:
+            # The view asked for these children before they were known.
+            self.fetchMore(index)
@@ -83,9 +83,8 @@ class SettingsWindow(QDialog):
             print(f"Invalid JSON: {e}")
             return
 
-        ConfigManager._config_data = new_dict
-        ConfigManager.save_config()          
-        self.signals.messageSignal.emit("Config saved. Some changes may require a restart.", "system")
+        ConfigManager.replace(new_dict)
+        self.signals.messageSignal.emit("Config saved.", "system")
         self.original_content = new_content
         self.close()
 
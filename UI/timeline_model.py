@@ -0,0 +1,76 @@
+# timeline_model.py
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+from UTILS.color_manager import ColorManager
+
+
+class TimelineModel(QAbstractListModel):
+    """
+    Events of the open room, oldest first, with their formatted lines.
+    Events are formatted a page at a time as they arrive. Older pages are inserted at the top as the user
+    scrolls up; 'prev_batch' is the token to continue from, or None once
+    the start of the room was reached.
+    """
+
+    def __init__(self, formatter, parent=None):
+        super().__init__(parent)
+        self.formatter = formatter
+        self.room_id = None
+        self.events = []
+        self.lines = []
+        self.prev_batch = None
+        self.loading = False
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.events)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        if role == Qt.DisplayRole:
+            return self.lines[index.row()][0]
+        if role == Qt.ForegroundRole:
+            return ColorManager.char_format(self.lines[index.row()][1]).foreground()
+        return None
+
+    def can_load_older(self) -> bool:
+        return self.room_id is not None and self.prev_batch is not None and not self.loading
+
+    def reset_room(self, room_id: str, events: list, prev_batch):
+
+        self.beginResetModel()
+        self.room_id = room_id
+        self.events = list(events)
+        self.lines = self.formatter(self.events)
+        self.prev_batch = prev_batch
+        self.loading = False
+        self.endResetModel()
+
+    def clear(self):
+        self.reset_room(None, [], None)
+
+    def append_events(self, room_id: str, events: list):
+
+        if room_id != self.room_id or not events:
+            return
+        first = len(self.events)
+        self.beginInsertRows(QModelIndex(), first, first + len(events) - 1)
+        self.events.extend(events)
+        self.lines.extend(self.formatter(events))
+        self.endInsertRows()
+
+    def prepend_events(self, room_id: str, events: list, prev_batch):
+        """Inserts an older page (oldest first) above the current rows."""
+
+        if room_id != self.room_id:
+            return
+        self.loading = False
+        self.prev_batch = prev_batch
+        if not events:
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(events) - 1)
+        self.events[:0] = events
+        self.lines[:0] = self.formatter(events)
+        self.endInsertRows()
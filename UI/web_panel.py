@@ -0,0 +1,55 @@
+# web_panel.py
+# Imports QtWebEngine, so only import this module when the panel is needed.
+import os
+
+from PySide6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
+from PySide6.QtWebEngineWidgets import QWebEngineView
+
+from UTILS.config_manager import CONFIG_PATH, ConfigManager
+
+WEB_DIR = os.path.join(os.path.dirname(CONFIG_PATH), "web")
+
+def create_profile(parent=None) -> QWebEngineProfile:
+    """
+    A named, persistent profile under STORE/web: cookies, storage and a
+    bounded disk cache survive closing the panel and restarting the app.
+    """
+    profile = QWebEngineProfile("fastliner", parent)
+    profile.setPersistentStoragePath(os.path.join(WEB_DIR, "storage"))
+    profile.setCachePath(os.path.join(WEB_DIR, "cache"))
+    profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.DiskHttpCache)
+    profile.setHttpCacheMaximumSize(max(0, int(ConfigManager.get("web_cache_size_mb", 200))) * 1024 * 1024)
+    profile.setPersistentCookiesPolicy(QWebEngineProfile.PersistentCookiesPolicy.AllowPersistentCookies)
+    return profile
+
+class WebPanel(QWebEngineView):
+    """
+    Web view on the shared profile. The page is either loaded fresh on
+    show, or resumed if it was suspended when the panel was closed.
+    """
+
+    def __init__(self, profile, parent=None):
+        super().__init__(parent)
+        self.setPage(QWebEnginePage(profile, self))
+        self.suspended = False
+
+    def show_page(self):
+        if self.suspended:
+            self.page().setLifecycleState(QWebEnginePage.LifecycleState.Active)
+            self.suspended = False
+        elif self.url().isEmpty() or self.url().toString() == "about:blank":
+            self.setUrl(ConfigManager.get("web_start_url", "https://www.google.com"))
+        self.setVisible(True)
+
+    def hide_page(self, action: str):
+        """
+        'suspend' freezes the page where it is (timers and scripts stop, the
+        DOM stays in memory); 'blank' unloads it.
+        """
+        self.setVisible(False)
+        if action == "suspend":
+            # Only hidden pages can be frozen.
+            self.page().setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+            self.suspended = True
+        else:
+            self.setUrl("about:blank")
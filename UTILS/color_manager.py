@@ -1,9 +1,48 @@
 # UTILS/color_manager.py
 import re
+from PySide6.QtGui import QTextCharFormat, QColor
 from UTILS.config_manager import ConfigManager
 
+# Message role -> (config key, fallback color).
+ROLE_COLORS = {
+    "system": ("text_system", "#458588"),
+    "error": ("text_error", "#cc241d"),
+    "success": ("text_success", "#98971a"),
+    "warning": ("text_warning", "#d79921"),
+    "server": ("text_server", "#d65d0e"),
+    "debug": ("text_debug", "#b16286"),
+}
+
+HTML_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
 class ColorManager:
-  
+    """
+    Role colors are resolved from the config once into a table of colors
+    and char formats; the table is rebuilt when the config changes. Roles
+    without an entry ('user', None, ...) use the general text color.
+    """
+    _config_version = None
+    _colors = {}
+    _char_formats = {}
+
+    @classmethod
+    def _table(cls):
+        if cls._config_version != ConfigManager.version():
+            cls._rebuild()
+        return cls._colors
+
+    @classmethod
+    def _rebuild(cls):
+
+        colors_config = ConfigManager.get("colors", {})
+        colors = {None: colors_config.get("text_general", "#282828")}
+        for role, (key, fallback) in ROLE_COLORS.items():
+            colors[role] = colors_config.get(key, fallback)
+
+        cls._colors = colors
+        cls._char_formats = {}
+        cls._config_version = ConfigManager.version()
+
     @classmethod
     def colorize(cls, raw_text: str, role: str = None) -> str:
         """
@@ -11,49 +50,31 @@ class ColorManager:
         - If 'role' is 'system', use the system color from config.
         - Otherwise, use the default text color.
         """
-        # 1) Get color config
-        colors_config = ConfigManager.get("colors", {})
-        default_color = colors_config.get("text_general", "#282828") 
-        system_color = colors_config.get("text_system", "#458588")
-        error_color = colors_config.get("text_error", "#cc241d")   
-        success_color = colors_config.get("text_success", "#98971a")
-        warning_color = colors_config.get("text_warning", "#d79921")
-        server_color = colors_config.get("text_server", "#d65d0e")
-        debug_color = colors_config.get("text_debug", "#b16286")
-
-        # 2) Escape HTML special characters
-        safe_text = cls.escape_html(raw_text)
-
-        # 3) Convert newlines to <br>
-        safe_text = safe_text.replace("\n", "<br>")
-
-        # 4) Pick the color based on role
-        if role == "system":
-            chosen_color = system_color
-        elif role == "error":
-            chosen_color = error_color 
-        elif role == "user":
-            chosen_color = default_color
-        elif role == "success":
-            chosen_color = success_color  
-        elif role == "warning":
-            chosen_color = warning_color   
-        elif role == "server":
-            chosen_color = server_color
-        elif role == "debug":
-            chosen_color = debug_color     
-        else:
-            chosen_color = default_color
-
-        # 5) Wrap the text in a <span> with the chosen color
-        colored_html = f"<span style='color:{chosen_color};'>{safe_text}</span>"
-        return colored_html
+        safe_text = cls.escape_html(raw_text).replace("\n", "<br>")
+        return f"<span style='color:{cls.color_for(role)};'>{safe_text}</span>"
+
+    @classmethod
+    def color_for(cls, role: str = None) -> str:
+        """
+        The configured text color of a message role ('system', 'error', ...).
+        """
+        colors = cls._table()
+        return colors.get(role) or colors[None]
+
+    @classmethod
+    def char_format(cls, role: str = None) -> QTextCharFormat:
+        """A shared QTextCharFormat in the color of a role."""
+        cls._table()
+        char_format = cls._char_formats.get(role)
+        if char_format is None:
+            char_format = QTextCharFormat()
+            char_format.setForeground(QColor(cls.color_for(role)))
+            cls._char_formats[role] = char_format
+        return char_format
 
     @staticmethod
     def escape_html(text: str) -> str:
         """
         Replace <, >, & with HTML entities to avoid breaking HTML markup.
         """
-        return (text.replace("&", "&amp;")
-                    .replace("<", "&lt;")
-                    .replace(">", "&gt;"))
\ No newline at end of file
+        return text.translate(HTML_ESCAPE_TABLE)
@@ -1,7 +1,9 @@
 # UTILS/config_manager.py
+import copy
 import json
 import os
 import sys
+import threading
 
 DEFAULT_CONFIG = {
     "homeserver": "http://matrix.fastliner.club:8008",
@@ -13,6 +15,33 @@ DEFAULT_CONFIG = {
     "settings_height": 500,
     "room_settings_width": 700,
     "room_settings_height": 500,
+    "session_save_interval": 10,
+    "session_timeline_limit": 50,
+    "remember_session": True,
+    "login_timeout": 5,
+    "sync_filter": {
+        "timeline_limit": 20,
+        "lazy_load_members": True,
+        "include_presence": False,
+        "include_ephemeral": False,
+        "include_account_data": False,
+        "exclude_event_types": []
+    },
+    "timeline_buffer_size": 200,
+    "timeline_page_size": 30,
+    "state_fetch_concurrency": 8,
+    "state_fetch_timeout": 10,
+    "room_stream_interval": 250,
+    "room_refresh_delay_ms": 300,
+    "space_hierarchy_page_size": 50,
+    "scrollback_lines": 5000,
+    "web_close_action": "destroy",
+    "web_start_url": "https://www.google.com",
+    "web_cache_size_mb": 200,
+    "loop_monitor": True,
+    "loop_lag_interval_ms": 100,
+    "loop_lag_threshold_ms": 100,
+    "loop_slow_callback_ms": 20,
     "colors": {
         "text_general": "#282828", 
         "text_system": "#458588",
@@ -57,8 +86,28 @@ def _resources_dir():
 
 CONFIG_PATH = os.path.join(_resources_dir(), "STORE", "config.json")
 
+# Seconds a change waits for more changes before the config is written.
+SAVE_DELAY = 0.5
+
 class ConfigManager:
+    """
+    In-memory config backed by config.json. Changes are written behind:
+    a burst of changes within SAVE_DELAY results in one write, done on a
+    timer thread to a temp file that then replaces config.json atomically.
+
+    Callbacks subscribed to a top-level key are called with the new value
+    whenever that key changes, whether through this class or by editing
+    config.json (see reload()).
+    """
     _config_data = None
+    # Bumped whenever the config changes, so caches derived from it
+    # know when to rebuild.
+    _version = 0
+    _lock = threading.RLock()
+    _save_timer = None
+    # Text of the last write, so reload() can ignore our own writes.
+    _written = None
+    _subscribers = {}
 
     @classmethod
     def load_config(cls):
@@ -68,7 +117,7 @@ class ConfigManager:
         if cls._config_data is None:
             if not os.path.exists(CONFIG_PATH):
                 # Create default config JSON if missing
-                cls._config_data = DEFAULT_CONFIG.copy()
+                cls._config_data = copy.deepcopy(DEFAULT_CONFIG)
                 cls.save_config()
             else:
                 with open(CONFIG_PATH, "r", encoding="utf-8") as f:
@@ -76,38 +125,139 @@ class ConfigManager:
                         cls._config_data = json.load(f)
                     except json.JSONDecodeError:
                         # If the file is invalid, start fresh
-                        cls._config_data = DEFAULT_CONFIG.copy()
+                        cls._config_data = copy.deepcopy(DEFAULT_CONFIG)
                         cls.save_config()
         return cls._config_data
 
     @classmethod
     def save_config(cls):
         """
-        Writes the current config to JSON.
+        Schedules a write of the current config; see flush() for writing now.
         """
-        if cls._config_data is not None:
-            with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-                json.dump(cls._config_data, f, indent=4)
+        if cls._config_data is None:
+            return
+
+        with cls._lock:
+            cls._version += 1
+            if cls._save_timer is not None:
+                cls._save_timer.cancel()
+            cls._save_timer = threading.Timer(SAVE_DELAY, cls.flush)
+            cls._save_timer.daemon = True
+            cls._save_timer.start()
+
+    @classmethod
+    def flush(cls):
+        """
+        Writes a pending change to disk right away. Runs on the timer thread,
+        and is called on shutdown so no change is lost.
+        """
+        with cls._lock:
+            if cls._save_timer is None:
+                return
+            cls._save_timer.cancel()
+            cls._save_timer = None
+            content = json.dumps(cls._config_data, indent=4)
+
+        tmp_path = CONFIG_PATH + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            cls._written = content
+            os.replace(tmp_path, CONFIG_PATH)
+        except OSError as e:
+            print(f"Failed to write config: {e}")
+
+    @classmethod
+    def version(cls) -> int:
+        return cls._version
 
     @classmethod
     def get(cls, key, default=None):
         """
-        Get a config value by key.
+        Get a config value by key. Nested values ('colors', ...) are copies,
+        so changing them has no effect until they are passed to set().
         """
-        data = cls.load_config()
-        return data.get(key, default)
+        value = cls.load_config().get(key, default)
+        if isinstance(value, (dict, list)):
+            return copy.deepcopy(value)
+        return value
 
     @classmethod
     def set(cls, key, value):
         """
         Set a config value and persist.
         """
-        data = cls.load_config()
-        data[key] = value
-        cls.save_config()
+        cls.set_many({key: value})
+
+    @classmethod
+    def set_many(cls, values: dict):
+        """
+        Set several config values at once; they are persisted in one write.
+        """
+        data = copy.deepcopy(cls.load_config())
+        data.update(copy.deepcopy(values))
+        cls.replace(data)
+
+    @classmethod
+    def replace(cls, new_data: dict, save: bool = True):
+        """
+        Swaps in a whole new config and notifies the subscribers of every
+        top-level key whose value changed.
+        """
+        old_data = cls.load_config()
+        with cls._lock:
+            cls._config_data = new_data
+        if save:
+            cls.save_config()
+        else:
+            cls._version += 1
+
+        changed = [
+            key for key in set(old_data) | set(new_data)
+            if old_data.get(key) != new_data.get(key)
+        ]
+        for key in changed:
+            for callback in list(cls._subscribers.get(key, [])):
+                try:
+                    callback(new_data.get(key))
+                except Exception as e:
+                    print(f"Config subscriber for '{key}' failed: {e}")
+
+    @classmethod
+    def reload(cls) -> bool:
+        """
+        Re-reads config.json after it was edited outside the app. Our own
+        writes, invalid JSON and reloads while a write is pending are
+        ignored. Returns True if the config changed.
+        """
+        if cls._save_timer is not None:
+            return False
+        try:
+            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                content = f.read()
+            if content == cls._written:
+                return False
+            new_data = json.loads(content)
+        except (OSError, json.JSONDecodeError):
+            return False
+
+        if not isinstance(new_data, dict) or new_data == cls._config_data:
+            return False
+        cls.replace(new_data, save=False)
+        return True
+
+    @classmethod
+    def subscribe(cls, key: str, callback):
+        """Calls callback(new_value) whenever 'key' changes."""
+        cls._subscribers.setdefault(key, []).append(callback)
+
+    @classmethod
+    def unsubscribe(cls, key: str, callback):
+        callbacks = cls._subscribers.get(key, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
 
     @classmethod
     def restore_defaults(cls):
         """Resets the config data to DEFAULT_CONFIG and saves."""
-        cls._config_data = DEFAULT_CONFIG.copy()
-        cls.save_config()    
\ No newline at end of file
+        cls.replace(copy.deepcopy(DEFAULT_CONFIG))
@@ -0,0 +1,39 @@
+# UTILS/config_watcher.py
+import os
+
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer
+
+from UTILS.config_manager import ConfigManager, CONFIG_PATH
+
+class ConfigWatcher(QObject):
+    """
+    Reloads the config when config.json is edited outside the app. Editors
+    (and our own atomic writes) replace the file, which drops it from the
+    watch list, so the path is added again after every change.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.on_file_changed)
+        self.watcher.directoryChanged.connect(self.on_file_changed)
+
+        # Editors often write in several steps; reload once they are done.
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(200)
+        self.reload_timer.timeout.connect(self.reload)
+
+        self.watcher.addPath(os.path.dirname(CONFIG_PATH))
+        self.watch_file()
+
+    def watch_file(self):
+        if os.path.exists(CONFIG_PATH) and CONFIG_PATH not in self.watcher.files():
+            self.watcher.addPath(CONFIG_PATH)
+
+    def on_file_changed(self, path):
+        self.reload_timer.start()
+
+    def reload(self):
+        self.watch_file()
+        ConfigManager.reload()
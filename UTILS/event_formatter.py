@@ -0,0 +1,103 @@
+# UTILS/event_formatter.py
+from datetime import datetime
+
+class TimestampRenderer:
+    """
+    Renders server timestamps (ms) as local 'YYYY-MM-DD HH:MM:SS'. The date,
+    hour and minute part is computed once per minute; events of the same
+    second reuse the whole string.
+    """
+    __slots__ = ("minutes", "last_second", "last_text")
+
+    # Upper bound of cached minutes, so a long session does not grow it.
+    MAX_MINUTES = 4096
+
+    def __init__(self):
+        self.minutes = {}
+        self.last_second = None
+        self.last_text = "unknown"
+
+    def render(self, ts) -> str:
+        if not ts:
+            return "unknown"
+
+        second = ts // 1000
+        if second == self.last_second:
+            return self.last_text
+
+        minute = second // 60
+        prefix = self.minutes.get(minute)
+        if prefix is None:
+            if len(self.minutes) >= self.MAX_MINUTES:
+                self.minutes.clear()
+            prefix = datetime.fromtimestamp(minute * 60).strftime("%Y-%m-%d %H:%M")
+            self.minutes[minute] = prefix
+
+        self.last_second = second
+        self.last_text = f"{prefix}:{second % 60:02d}"
+        return self.last_text
+
+class EventFormatter:
+    """
+    Turns timeline events into the (text, role) lines shown to the user.
+    Formatters are registered per event type; events without one are shown
+    as an audit line listing their content.
+    """
+    _formatters = {}
+    _timestamps = TimestampRenderer()
+
+    @classmethod
+    def register(cls, event_type: str):
+        """Decorator registering 'func(event, time_str)' for an event type."""
+        def decorator(func):
+            cls._formatters[event_type] = func
+            return func
+        return decorator
+
+    @classmethod
+    def format_time(cls, ts) -> str:
+        return cls._timestamps.render(ts)
+
+    @classmethod
+    def format_event(cls, event, show_event_id: bool = False) -> tuple:
+        return cls.format_events([event], show_event_id)[0]
+
+    @classmethod
+    def format_events(cls, events, show_event_id: bool = False) -> list:
+        """Formats a batch of events (e.g. one history page) in one loop."""
+        formatters = cls._formatters
+        render = cls._timestamps.render
+        lines = []
+
+        for event in events:
+            source = getattr(event, "source", None) or {}
+            time_str = render(getattr(event, "server_timestamp", None))
+            formatter = formatters.get(source.get("type"), format_audit)
+            text, role = formatter(event, time_str)
+            if show_event_id:
+                text = f"Event ID: {getattr(event, 'event_id', None)} | {text}"
+            lines.append((text, role))
+
+        return lines
+
+def format_audit(event, time_str: str) -> tuple:
+    """Fallback: the sender and a flat listing of the event content."""
+    sender = getattr(event, "sender", "server")
+    content = getattr(event, "content", {})
+
+    if not content and hasattr(event, "source"):
+        content = event.source.get("content", {})
+
+    if isinstance(content, dict) and content:
+        content_str = ", ".join(f"{k}={v}" for k, v in content.items())
+    else:
+        content_str = str(content) if content else "(no content)"
+
+    return f"{sender} [{time_str}] : {content_str}", "server"
+
+@EventFormatter.register("m.room.message")
+def format_message(event, time_str: str) -> tuple:
+    content = event.source.get("content") or {}
+    if content.get("msgtype") != "m.text":
+        return format_audit(event, time_str)
+    return f"{event.sender} [{time_str}] : {content.get('body', '')}", "user"
@@ -0,0 +1,221 @@
+# UTILS/loop_monitor.py
+import asyncio
+import os
+import time
+from collections import deque
+
+from UTILS.config_manager import ConfigManager
+
+# How far back the on-demand summary looks.
+SUMMARY_WINDOW = 60.0
+# Stalls kept for the summary.
+MAX_STALLS = 50
+# Callbacks named per stall.
+STALL_CULPRITS = 5
+# asyncio's own coroutines (sleep, wait_for, ...) are skipped when naming one.
+ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+
+def describe_handle(handle, resumed_at: tuple = None) -> str:
+    """
+    Names what a loop callback ran. A task step is shown as the task's
+    coroutine with where its await chain resumed ('resumed_at', from
+    innermost_frame() before the step) and where it suspended again, so the
+    code that ran lies between the two; a plain callback is shown as its
+    function.
+    """
+    callback = handle._callback
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        task_name = getattr(coro, "__qualname__", None) or repr(coro)
+        resumed = _format_position(*resumed_at) if resumed_at else "start"
+        suspended = innermost_frame(coro)
+        return f"task {task_name}: {resumed} -> {_format_position(*suspended) if suspended else 'done'}"
+
+    function = getattr(callback, "__func__", callback)
+    name = getattr(function, "__qualname__", None) or repr(callback)
+    code = getattr(function, "__code__", None)
+    return f"{name} ({_short_path(code.co_filename)}:{code.co_firstlineno})" if code else name
+
+def innermost_frame(coro) -> tuple:
+    """
+    (coroutine, line) of the innermost coroutine of an await chain, skipping
+    asyncio's own (sleep, wait_for, ...); None once the chain has finished.
+    Cheap enough to take before every task step; only slow steps are
+    formatted.
+    """
+    found = None
+    while True:
+        frame = getattr(coro, "cr_frame", None)
+        if frame is None:
+            return found
+        if not frame.f_code.co_filename.startswith(ASYNCIO_DIR):
+            found = (coro, frame.f_lineno)
+        coro = coro.cr_await
+
+def _format_position(coro, line: int) -> str:
+    return f"{coro.__qualname__} ({_short_path(coro.cr_code.co_filename)}:{line})"
+
+def _short_path(path: str) -> str:
+    parts = path.replace("\\", "/").split("/")
+    return "/".join(parts[-2:])
+
+class LoopMonitor:
+    """
+    Watchdog for the event loop that network I/O, parsing, formatting and
+    Qt painting all share.
+
+    A timer on the loop measures how late it fires (the lag: how long
+    anything else waited to run). Every loop callback is timed as well; the
+    ones slower than 'loop_slow_callback_ms' are remembered until the next
+    tick, so when a tick is 'loop_lag_threshold_ms' late, or a callback
+    alone took that long, the stall is printed with the callbacks and
+    coroutines that caused it. Lag that no
+    callback accounts for was spent in Qt (events, layout, painting).
+
+    report() summarizes the last SUMMARY_WINDOW seconds on demand.
+    """
+    _loop = None
+    _handle = None
+    _expected = 0.0
+    _original_run = None
+
+    interval = 0.1
+    threshold = 0.1
+    slow_callback = 0.02
+
+    _samples = deque()
+    _pending = []
+    _stalls = deque(maxlen=MAX_STALLS)
+    _slow = {}
+    _max_lag = 0.0
+
+    @classmethod
+    def start(cls, loop=None):
+        """Starts watching 'loop' (the running or current loop by default)."""
+        if cls._loop is not None or not ConfigManager.get("loop_monitor", True):
+            return
+        cls._loop = loop or asyncio.get_event_loop()
+        cls.apply_config()
+        for key in ("loop_lag_interval_ms", "loop_lag_threshold_ms", "loop_slow_callback_ms"):
+            ConfigManager.subscribe(key, cls.apply_config)
+
+        if cls._original_run is None:
+            cls._original_run = asyncio.Handle._run
+            asyncio.Handle._run = cls._timed_run
+
+        cls._expected = cls._loop.time() + cls.interval
+        cls._handle = cls._loop.call_later(cls.interval, cls._tick)
+
+    @classmethod
+    def stop(cls):
+        if cls._handle is not None:
+            cls._handle.cancel()
+        if cls._original_run is not None:
+            asyncio.Handle._run = cls._original_run
+            cls._original_run = None
+        for key in ("loop_lag_interval_ms", "loop_lag_threshold_ms", "loop_slow_callback_ms"):
+            ConfigManager.unsubscribe(key, cls.apply_config)
+        cls._loop = None
+        cls._handle = None
+
+    @classmethod
+    def apply_config(cls, *_):
+        cls.interval = max(10, int(ConfigManager.get("loop_lag_interval_ms", 100))) / 1000
+        cls.threshold = max(1, int(ConfigManager.get("loop_lag_threshold_ms", 100))) / 1000
+        cls.slow_callback = max(1, int(ConfigManager.get("loop_slow_callback_ms", 20))) / 1000
+
+    @staticmethod
+    def _timed_run(handle):
+        # Where a task resumes is only known before its step runs.
+        owner = getattr(handle._callback, "__self__", None)
+        resumed_at = innermost_frame(owner.get_coro()) if isinstance(owner, asyncio.Task) else None
+
+        started = time.perf_counter()
+        LoopMonitor._original_run(handle)
+        elapsed = time.perf_counter() - started
+        if elapsed >= LoopMonitor.slow_callback:
+            LoopMonitor._pending.append((elapsed, describe_handle(handle, resumed_at)))
+
+    @classmethod
+    def _tick(cls):
+        now = cls._loop.time()
+        lag = max(0.0, now - cls._expected)
+        pending, cls._pending = cls._pending, []
+
+        cls._samples.append((now, lag))
+        while cls._samples and cls._samples[0][0] < now - SUMMARY_WINDOW:
+            cls._samples.popleft()
+        cls._max_lag = max(cls._max_lag, lag)
+
+        for elapsed, name in pending:
+            count, total, longest = cls._slow.get(name, (0, 0.0, 0.0))
+            cls._slow[name] = (count + 1, total + elapsed, max(longest, elapsed))
+
+        # A callback can block the loop for up to an interval more than the
+        # tick is late, depending on when it started, so it counts on its own.
+        stalled = max([lag] + [elapsed for elapsed, _ in pending])
+        if stalled >= cls.threshold:
+            stall = {
+                "time": time.time(),
+                "lag": stalled,
+                "callbacks": sorted(pending, reverse=True)[:STALL_CULPRITS],
+                "unaccounted": max(0.0, lag - sum(elapsed for elapsed, _ in pending)),
+            }
+            cls._stalls.append(stall)
+            print("\n".join(cls._format_stall(stall)))
+
+        cls._expected = now + cls.interval
+        cls._handle = cls._loop.call_later(cls.interval, cls._tick)
+
+    @classmethod
+    def reset(cls):
+        cls._samples.clear()
+        cls._pending = []
+        cls._stalls.clear()
+        cls._slow = {}
+        cls._max_lag = 0.0
+
+    @classmethod
+    def _format_stall(cls, stall: dict) -> list:
+        clock = time.strftime("%H:%M:%S", time.localtime(stall["time"]))
+        lines = [f"Event loop stalled {stall['lag'] * 1000:.0f} ms at {clock}:"]
+        for elapsed, name in stall["callbacks"]:
+            lines.append(f"  {elapsed * 1000:7.1f} ms  {name}")
+        if stall["unaccounted"] >= cls.slow_callback:
+            lines.append(f"  {stall['unaccounted'] * 1000:7.1f} ms  outside loop callbacks (Qt events, painting)")
+        return lines
+
+    @classmethod
+    def report(cls, top: int = 10) -> list:
+        """The rolling summary as lines of text."""
+        if cls._loop is None:
+            return ["The event loop monitor is not running."]
+        if not cls._samples:
+            return ["No event loop samples yet."]
+
+        lags = sorted(lag for _, lag in cls._samples)
+
+        def percentile(fraction):
+            return lags[min(len(lags) - 1, max(0, round(fraction * len(lags)) - 1))] * 1000
+
+        window = cls._samples[-1][0] - cls._samples[0][0]
+        stalls = [stall for stall in cls._stalls if stall["time"] >= time.time() - SUMMARY_WINDOW]
+        lines = [
+            f"Event loop lag over the last {window:.0f} s ({len(lags)} samples every {cls.interval * 1000:.0f} ms): "
+            f"p50 {percentile(0.50):.1f}, p95 {percentile(0.95):.1f}, p99 {percentile(0.99):.1f}, "
+            f"max {lags[-1] * 1000:.1f} ms; max since start {cls._max_lag * 1000:.1f} ms.",
+            f"Stalls over {cls.threshold * 1000:.0f} ms: {len(stalls)} in this window, {len(cls._stalls)} kept.",
+        ]
+
+        if cls._slow:
+            lines.append(f"Slowest callbacks since start (over {cls.slow_callback * 1000:.0f} ms; count, total, max ms):")
+            slowest = sorted(cls._slow.items(), key=lambda item: item[1][1], reverse=True)[:top]
+            for name, (count, total, longest) in slowest:
+                lines.append(f"  {count:5d} {total * 1000:9.1f} {longest * 1000:8.1f}  {name}")
+
+        if cls._stalls:
+            lines.append("Latest stalls:")
+            for stall in list(cls._stalls)[-3:]:
+                lines.extend("  " + line for line in cls._format_stall(stall))
+        return lines
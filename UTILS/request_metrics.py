@@ -0,0 +1,181 @@
+# UTILS/request_metrics.py
+import json
+import os
+import time
+from collections import deque
+
+from UTILS.config_manager import CONFIG_PATH
+
+STATS_PATH = os.path.join(os.path.dirname(CONFIG_PATH), "stats.json")
+
+# Upper bounds of the latency histogram buckets, in ms; the last bucket is open.
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Recent samples kept per series for the percentiles.
+RECENT_SAMPLES = 500
+
+class _Series:
+    """Count, sum, max, a histogram and the recent samples of one duration."""
+    __slots__ = ("count", "total", "max", "buckets", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def add(self, seconds: float):
+        ms = seconds * 1000
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+        self.recent.append(ms)
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Nearest-rank percentile of the recent samples, in ms."""
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max,
+            "histogram_ms": {
+                **{f"<={bound}": count for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets)},
+                f">{LATENCY_BUCKETS_MS[-1]}": self.buckets[-1],
+            },
+        }
+
+class _Endpoint:
+    __slots__ = ("latency", "wait", "errors", "bytes_sent", "bytes_received")
+
+    def __init__(self):
+        # The whole call: request, response body, parsing and retries.
+        self.latency = _Series()
+        # Until the response headers arrived, i.e. network plus server time.
+        self.wait = _Series()
+        self.errors = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+class RequestMetrics:
+    """
+    Per-endpoint statistics of the homeserver requests made this run, and
+    the cycle times of the sync loop. Endpoints are named after the nio
+    response class (RoomMessagesResponse -> room_messages).
+
+    Latency percentiles cover the last RECENT_SAMPLES calls of an endpoint;
+    counts, errors, bytes and histograms cover the whole run.
+    """
+    _started = time.time()
+    _endpoints = {}
+    # Sync loop: the /sync request (mostly long-poll waiting), the work done
+    # on its response, and the number of timeline and state events in it.
+    _sync_request = _Series()
+    _sync_process = _Series()
+    _sync_events = 0
+
+    @classmethod
+    def record(cls, endpoint: str, seconds: float, ok: bool = True, wait: float = None,
+               bytes_sent: int = 0, bytes_received: int = 0):
+        stats = cls._endpoints.get(endpoint)
+        if stats is None:
+            stats = cls._endpoints[endpoint] = _Endpoint()
+        stats.latency.add(seconds)
+        if wait is not None:
+            stats.wait.add(wait)
+        if not ok:
+            stats.errors += 1
+        stats.bytes_sent += bytes_sent
+        stats.bytes_received += bytes_received
+
+    @classmethod
+    def record_sync_cycle(cls, request_seconds: float, process_seconds: float, events: int = 0):
+        cls._sync_request.add(request_seconds)
+        cls._sync_process.add(process_seconds)
+        cls._sync_events += events
+
+    @classmethod
+    def reset(cls):
+        cls._started = time.time()
+        cls._endpoints = {}
+        cls._sync_request = _Series()
+        cls._sync_process = _Series()
+        cls._sync_events = 0
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        """Everything recorded so far as JSON-serializable data."""
+        endpoints = {}
+        for name, stats in sorted(cls._endpoints.items()):
+            count = stats.latency.count
+            endpoints[name] = {
+                "count": count,
+                "errors": stats.errors,
+                "error_rate": stats.errors / count if count else 0.0,
+                "bytes_sent": stats.bytes_sent,
+                "bytes_received": stats.bytes_received,
+                "latency": stats.latency.to_dict(),
+                "wait": stats.wait.to_dict(),
+            }
+        return {
+            "started": cls._started,
+            "captured": time.time(),
+            "endpoints": endpoints,
+            "sync_loop": {
+                "cycles": cls._sync_process.count,
+                "events": cls._sync_events,
+                "request": cls._sync_request.to_dict(),
+                "process": cls._sync_process.to_dict(),
+            },
+        }
+
+    @classmethod
+    def report(cls) -> list:
+        """The statistics as lines of text."""
+        if not cls._endpoints:
+            return ["No homeserver requests yet."]
+
+        minutes = (time.time() - cls._started) / 60
+        lines = [
+            f"Homeserver requests in the last {minutes:.1f} min (ms; percentiles of the last {RECENT_SAMPLES}):",
+            f"  {'endpoint':<24}{'calls':>7}{'err%':>7}{'p50':>9}{'p95':>9}{'max':>9}{'wait p50':>10}{'KiB in':>10}",
+        ]
+        for name, stats in sorted(cls._endpoints.items(), key=lambda item: -item[1].latency.total):
+            latency = stats.latency
+            lines.append(
+                f"  {name:<24}{latency.count:>7}{stats.errors / latency.count * 100:>6.1f}%"
+                f"{latency.percentile(0.50):>9.1f}{latency.percentile(0.95):>9.1f}{latency.max:>9.1f}"
+                f"{stats.wait.percentile(0.50):>10.1f}{stats.bytes_received / 1024:>10.1f}"
+            )
+
+        process = cls._sync_process
+        if process.count:
+            lines.append(
+                f"Sync loop: {process.count} cycles, {cls._sync_events} events; handling a response "
+                f"p50 {process.percentile(0.50):.1f}, p95 {process.percentile(0.95):.1f}, "
+                f"max {process.max:.1f} ms; request p50 {cls._sync_request.percentile(0.50):.1f} ms."
+            )
+        return lines
+
+    @classmethod
+    def export(cls, path: str = None) -> str:
+        """Writes the snapshot as JSON (by default STORE/stats.json) and returns the path."""
+        path = path or STATS_PATH
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cls.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+        return path
@@ -0,0 +1,143 @@
+# UTILS/room_state_cache.py
+
+# Member events are never read by the client and make up most of a room's
+# state, so they are not cached.
+IGNORED_STATE_TYPES = {"m.room.member"}
+
+class RoomStateCache:
+    """
+    Local copy of room state, keyed by room -> event type -> state key.
+
+    A room is 'complete' once its full state was seen (an HTTP state fetch,
+    or a sync that carried its m.room.create event); from then on it is kept
+    current by the state deltas of each sync and is served without requests.
+
+    The underlying dict is JSON-serializable so the session store can persist
+    it as is; take_changed() tells it which rooms to write again.
+    """
+    _rooms = {}
+    _changed = set()
+
+    @classmethod
+    def load(cls, rooms: dict):
+        """Use 'rooms' (e.g. restored from the session store) as the cache."""
+        cls._rooms = rooms
+        cls._changed = set()
+
+    @classmethod
+    def clear(cls):
+        cls._rooms = {}
+        cls._changed = set()
+
+    @classmethod
+    def remove(cls, room_id: str):
+        if cls._rooms.pop(room_id, None) is not None:
+            cls._changed.add(room_id)
+
+    @classmethod
+    def take_changed(cls) -> set:
+        """The rooms added, changed or removed since the last call."""
+        changed, cls._changed = cls._changed, set()
+        return changed
+
+    @classmethod
+    def is_complete(cls, room_id: str) -> bool:
+        room = cls._rooms.get(room_id)
+        return bool(room and room.get("complete"))
+
+    @classmethod
+    def has(cls, room_id: str) -> bool:
+        return room_id in cls._rooms
+
+    @classmethod
+    def room_ids(cls) -> list:
+        return list(cls._rooms)
+
+    @classmethod
+    def apply_events(cls, room_id: str, events: list) -> set:
+        """
+        Applies raw state event dicts to a room and returns the set of event
+        types that changed. Seeing m.room.create means the full state was
+        delivered, which marks the room complete.
+        """
+        room = cls._rooms.get(room_id)
+        if room is None:
+            room = cls._rooms[room_id] = {"complete": False, "state": {}}
+            cls._changed.add(room_id)
+        changed = set()
+
+        for event in events:
+            state_key = event.get("state_key")
+            event_type = event.get("type")
+            if state_key is None or not event_type or event_type in IGNORED_STATE_TYPES:
+                continue
+
+            content = event.get("content") or {}
+            by_key = room["state"].setdefault(event_type, {})
+            if by_key.get(state_key) != content:
+                by_key[state_key] = content
+                changed.add(event_type)
+
+            if event_type == "m.room.create" and not room["complete"]:
+                room["complete"] = True
+                cls._changed.add(room_id)
+
+        if changed:
+            cls._changed.add(room_id)
+        return changed
+
+    @classmethod
+    def replace(cls, room_id: str, events: list):
+        """Replaces a room's state with a full state snapshot."""
+        cls._rooms[room_id] = {"complete": False, "state": {}}
+        cls.apply_events(room_id, events)
+        cls._rooms[room_id]["complete"] = True
+        cls._changed.add(room_id)
+
+    @classmethod
+    def get(cls, room_id: str, event_type: str, state_key: str = ""):
+        """Content of one state event, or None if it is not cached."""
+        room = cls._rooms.get(room_id)
+        if not room:
+            return None
+        return room["state"].get(event_type, {}).get(state_key)
+
+    @classmethod
+    def get_all(cls, room_id: str, event_type: str) -> dict:
+        """All cached state events of a type, as {state_key: content}."""
+        room = cls._rooms.get(room_id)
+        if not room:
+            return {}
+        return dict(room["state"].get(event_type, {}))
+
+    @classmethod
+    def set(cls, room_id: str, event_type: str, state_key: str, content: dict):
+        """Records a state change made by this client before sync echoes it."""
+        cls.apply_events(room_id, [{"type": event_type, "state_key": state_key, "content": content}])
+
+    @classmethod
+    def room_details(cls, room_id: str, user_id: str) -> dict:
+        """
+        The room summary the client works with, built from cached state.
+        """
+        name = (cls.get(room_id, "m.room.name") or {}).get("name")
+        create = cls.get(room_id, "m.room.create") or {}
+
+        power_level = "unknown"
+        power_levels = cls.get(room_id, "m.room.power_levels")
+        if power_levels:
+            power_level = power_levels.get("users", {}).get(user_id)
+            if power_level is None:
+                power_level = power_levels.get("users_default", 0)
+
+        return {
+            "room_id": room_id,
+            "name": name or room_id,
+            "is_space": create.get("type") == "m.space",
+            "power_level": power_level,
+            "children": [
+                child_id
+                for child_id, content in cls.get_all(room_id, "m.space.child").items()
+                if content
+            ],
+        }
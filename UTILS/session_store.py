@@ -0,0 +1,295 @@
+# UTILS/session_store.py
+import json
+import os
+import re
+import threading
+import time
+
+from UTILS.config_manager import CONFIG_PATH, ConfigManager
+from UTILS.room_state_cache import RoomStateCache
+
+SESSION_DIR = os.path.join(os.path.dirname(CONFIG_PATH), "session")
+CREDENTIALS_PATH = os.path.join(SESSION_DIR, "credentials.json")
+
+# Sections keyed by room whose entries are serialized one by one and only
+# again when the room changed; they make up almost all of the file.
+ROOM_SECTIONS = ("room_state", "timelines")
+
+class SessionStore:
+    """
+    On-disk cache of the per-account sync state: the sync token, the last
+    known room list and the most recent timeline events of every joined room.
+
+    A save only serializes what changed: the JSON of each room's state and
+    timeline is kept until the room changes, and the small sections are
+    written anew. The file is assembled and written on a worker thread.
+    """
+    _path = None
+    _data = None
+    _dirty = False
+    _last_save = 0.0
+    _fragments = {}
+
+    _write_lock = threading.Lock()
+    _generation = 0
+
+    @classmethod
+    def load(cls, user_id: str, homeserver: str):
+        """
+        Loads (or creates) the session file for the given account.
+        """
+        os.makedirs(SESSION_DIR, exist_ok=True)
+        file_name = re.sub(r"[^A-Za-z0-9_.-]", "_", f"{user_id}@{homeserver}") + ".json"
+        cls._path = os.path.join(SESSION_DIR, file_name)
+        cls._data = None
+
+        if os.path.exists(cls._path):
+            with open(cls._path, "r", encoding="utf-8") as f:
+                try:
+                    cls._data = json.load(f)
+                except json.JSONDecodeError:
+                    cls._data = None
+
+        if not isinstance(cls._data, dict):
+            cls._data = {"next_batch": None, "rooms": [], "timelines": {}}
+
+        cls._fragments = {section: {} for section in ROOM_SECTIONS}
+        cls._dirty = False
+        cls._last_save = time.monotonic()
+        return cls._data
+
+    @classmethod
+    def is_loaded(cls) -> bool:
+        return cls._data is not None
+
+    @classmethod
+    def save(cls, force: bool = False, wait: bool = False):
+        """
+        Writes the session to disk. Unless forced, writes are throttled to
+        once per 'session_save_interval' seconds. The file is written in the
+        background unless 'wait' is set.
+        """
+        if cls._data is None:
+            return
+
+        fragments = cls._fragments["room_state"]
+        for room_id in RoomStateCache.take_changed():
+            fragments.pop(room_id, None)
+            cls._dirty = True
+
+        if not cls._dirty:
+            return
+
+        interval = ConfigManager.get("session_save_interval", 10)
+        if not force and time.monotonic() - cls._last_save < interval:
+            return
+
+        parts = cls._serialize()
+        cls._generation += 1
+        if wait:
+            cls._write(cls._path, parts, cls._generation)
+        else:
+            threading.Thread(
+                target=cls._write, args=(cls._path, parts, cls._generation), daemon=True
+            ).start()
+
+        cls._dirty = False
+        cls._last_save = time.monotonic()
+
+    @classmethod
+    def _serialize(cls) -> list:
+        """
+        The session as a list of JSON pieces that join into the file. Only
+        rooms without cached JSON are serialized.
+        """
+        parts = []
+        for key, value in cls._data.items():
+            if parts:
+                parts.append(",")
+            if key not in ROOM_SECTIONS:
+                parts.append(f"{json.dumps(key)}:{json.dumps(value)}")
+                continue
+
+            fragments = cls._fragments[key]
+            if len(fragments) > len(value):
+                for room_id in set(fragments) - set(value):
+                    del fragments[room_id]
+            entries = []
+            for room_id, entry in value.items():
+                fragment = fragments.get(room_id)
+                if fragment is None:
+                    fragment = fragments[room_id] = f"{json.dumps(room_id)}:{json.dumps(entry)}"
+                entries.append(fragment)
+            parts.append(f"{json.dumps(key)}:{{")
+            parts.append(",".join(entries))
+            parts.append("}")
+        return ["{"] + parts + ["}"]
+
+    @classmethod
+    def _write(cls, path: str, parts: list, generation: int):
+        with cls._write_lock:
+            # A newer snapshot is on its way; this one would only be replaced.
+            if generation != cls._generation:
+                return
+            tmp_path = path + ".tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write("".join(parts))
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Failed to write session: {e}")
+
+    @classmethod
+    def close(cls):
+        """Flushes pending changes and unloads the session."""
+        cls.save(force=True, wait=True)
+        cls._path = None
+        cls._data = None
+        cls._fragments = {}
+
+    @classmethod
+    def get_sync_token(cls):
+        if cls._data is None:
+            return None
+        return cls._data.get("next_batch")
+
+    @classmethod
+    def set_sync_token(cls, token: str):
+        if cls._data is None:
+            return
+        cls._data["next_batch"] = token
+        cls._dirty = True
+
+    @classmethod
+    def get_sync_filter_id(cls, definition: dict):
+        """Returns the uploaded filter ID if it was uploaded for this exact definition."""
+        if cls._data is None:
+            return None
+        stored = cls._data.get("sync_filter") or {}
+        if stored.get("definition") != definition:
+            return None
+        return stored.get("filter_id")
+
+    @classmethod
+    def set_sync_filter_id(cls, definition: dict, filter_id: str):
+        if cls._data is None:
+            return
+        cls._data["sync_filter"] = {"definition": definition, "filter_id": filter_id}
+        cls._dirty = True
+
+    @classmethod
+    def get_room_state(cls) -> dict:
+        """
+        The persisted room state cache. The returned dict is owned by the
+        store and is saved together with the sync token.
+        """
+        if cls._data is None:
+            return {}
+        return cls._data.setdefault("room_state", {})
+
+    @classmethod
+    def get_space_graph(cls) -> dict:
+        """The persisted space graph, owned by the store like the room state."""
+        if cls._data is None:
+            return {}
+        return cls._data.setdefault("space_graph", {})
+
+    @classmethod
+    def get_rooms(cls) -> list:
+        if cls._data is None:
+            return []
+        return cls._data.get("rooms", [])
+
+    @classmethod
+    def set_rooms(cls, room_details: list):
+        if cls._data is None:
+            return
+        cls._data["rooms"] = room_details
+        cls._dirty = True
+
+    @classmethod
+    def get_timeline(cls, room_id: str):
+        """
+        Returns the stored raw event dicts of a room (oldest first) and the
+        token to paginate backwards from the oldest of them.
+        """
+        if cls._data is None:
+            return [], None
+        stored = cls._data.get("timelines", {}).get(room_id) or {}
+        return stored.get("events", []), stored.get("prev_batch")
+
+    @classmethod
+    def get_timeline_room_ids(cls) -> list:
+        if cls._data is None:
+            return []
+        return list(cls._data.get("timelines", {}))
+
+    @classmethod
+    def set_timeline(cls, room_id: str, event_sources: list, prev_batch: str = None):
+        """
+        Stores the raw event dicts of a room, keeping only the newest
+        'session_timeline_limit' events.
+        """
+        if cls._data is None:
+            return
+        limit = ConfigManager.get("session_timeline_limit", 50)
+        event_sources = list(event_sources)
+        if len(event_sources) > limit:
+            # The oldest kept event has no pagination token of its own;
+            # MatrixClient.open_room anchors one again when it is shown.
+            prev_batch = None
+        cls._data.setdefault("timelines", {})[room_id] = {
+            "events": event_sources[-limit:] if limit > 0 else [],
+            "prev_batch": prev_batch,
+        }
+        cls._fragments["timelines"].pop(room_id, None)
+        cls._dirty = True
+
+    @classmethod
+    def remove_timeline(cls, room_id: str):
+        if cls._data is None:
+            return
+        if cls._data.get("timelines", {}).pop(room_id, None) is not None:
+            cls._fragments["timelines"].pop(room_id, None)
+            cls._dirty = True
+
+    @classmethod
+    def save_credentials(cls, homeserver: str, username: str, user_id: str, device_id: str, access_token: str):
+        """
+        Stores the login of the current device so the next start can restore
+        it instead of logging in again. The file is only readable by the owner.
+        """
+        os.makedirs(SESSION_DIR, exist_ok=True)
+        credentials = {
+            "homeserver": homeserver,
+            "username": username,
+            "user_id": user_id,
+            "device_id": device_id,
+            "access_token": access_token,
+        }
+        tmp_path = CREDENTIALS_PATH + ".tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(credentials, f)
+        os.replace(tmp_path, CREDENTIALS_PATH)
+
+    @classmethod
+    def load_credentials(cls):
+        """Returns the saved login dict, or None if there is none."""
+        if not os.path.exists(CREDENTIALS_PATH):
+            return None
+        with open(CREDENTIALS_PATH, "r", encoding="utf-8") as f:
+            try:
+                credentials = json.load(f)
+            except json.JSONDecodeError:
+                return None
+        required = ("homeserver", "user_id", "device_id", "access_token")
+        if not isinstance(credentials, dict) or not all(credentials.get(k) for k in required):
+            return None
+        return credentials
+
+    @classmethod
+    def clear_credentials(cls):
+        """Forgets the saved login."""
+        if os.path.exists(CREDENTIALS_PATH):
+            os.remove(CREDENTIALS_PATH)
@@ -9,10 +9,15 @@ class SignalManager(QObject):
     _instance = None
 
     messageSignal = Signal(str, str)
+    messageBatchSignal = Signal(list)
     commandSignal = Signal(str, list)
     roomSignal = Signal(list)
+    roomPatchSignal = Signal(dict)
     logoutSignal = Signal()
     blankSignal = Signal()
+    timelineSignal = Signal(str, list)
+    timelineResetSignal = Signal(str, list, object)
+    historySignal = Signal(str, list, object)
 
     def __new__(cls):
         if cls._instance is None:
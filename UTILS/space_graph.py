@@ -0,0 +1,81 @@
+# UTILS/space_graph.py
+
+class SpaceGraph:
+    """
+    Cached graph of spaces and their children, built from the space
+    hierarchy API. Nodes include rooms the user has not joined.
+
+    - rooms: room_id -> {"name", "is_space"}
+    - children: space_id -> [child room_id, ...]; a space without an entry
+      has not been fetched (or was invalidated) and must be requested again.
+
+    Spaces may contain each other, so any walk over the graph has to track
+    the rooms it already visited.
+    """
+    _data = {"rooms": {}, "children": {}}
+
+    @classmethod
+    def load(cls, data: dict):
+        """Use 'data' (e.g. restored from the session store) as the graph."""
+        data.setdefault("rooms", {})
+        data.setdefault("children", {})
+        cls._data = data
+
+    @classmethod
+    def clear(cls):
+        cls._data = {"rooms": {}, "children": {}}
+
+    @classmethod
+    def has_children(cls, space_id: str) -> bool:
+        """True if the children of a space are known."""
+        return space_id in cls._data["children"]
+
+    @classmethod
+    def get_children(cls, space_id: str):
+        """Child room IDs of a space, or None if they are not known."""
+        return cls._data["children"].get(space_id)
+
+    @classmethod
+    def get_room(cls, room_id: str):
+        return cls._data["rooms"].get(room_id)
+
+    @classmethod
+    def invalidate(cls, space_id: str):
+        """Forget the children of a space so they are fetched again."""
+        cls._data["children"].pop(space_id, None)
+
+    @classmethod
+    def add_hierarchy_rooms(cls, rooms: list):
+        """
+        Adds one page of rooms as returned by /rooms/{id}/hierarchy.
+        """
+        for room in rooms:
+            room_id = room.get("room_id")
+            if not room_id:
+                continue
+
+            is_space = room.get("room_type") == "m.space"
+            cls._data["rooms"][room_id] = {
+                "name": room.get("name") or room.get("canonical_alias") or room_id,
+                "is_space": is_space,
+            }
+
+            if is_space:
+                cls._data["children"][room_id] = [
+                    event.get("state_key")
+                    for event in room.get("children_state", [])
+                    if event.get("state_key") and event.get("content")
+                ]
+
+    @classmethod
+    def descendants(cls, space_id: str) -> set:
+        """All rooms below a space, cycle-safe."""
+        seen = set()
+        pending = [space_id]
+        while pending:
+            current = pending.pop()
+            for child_id in cls._data["children"].get(current) or []:
+                if child_id not in seen and child_id != space_id:
+                    seen.add(child_id)
+                    pending.append(child_id)
+        return seen
@@ -0,0 +1,165 @@
+# UTILS/startup_profiler.py
+import importlib.abc
+import os
+import sys
+import time
+
+# Enables profiling when set to a non-empty value other than "0".
+PROFILE_ENV = "FASTLINER_PROFILE_STARTUP"
+PROFILE_FLAG = "--profile-startup"
+
+class _TimedLoader(importlib.abc.Loader):
+    """
+    Wraps a module loader to time exec_module. The module gets its real
+    loader back before its code runs, so nothing inside it sees the wrapper.
+    """
+
+    def __init__(self, loader, name):
+        self.loader = loader
+        self.name = name
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        module.__loader__ = self.loader
+        if getattr(module, "__spec__", None) is not None:
+            module.__spec__.loader = self.loader
+        StartupProfiler.import_started(self.name)
+        try:
+            self.loader.exec_module(module)
+        finally:
+            StartupProfiler.import_finished(self.name)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """Meta path hook that hands every found module a timed loader."""
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, name)
+            return spec
+        return None
+
+class StartupProfiler:
+    """
+    Records how long launching takes: named marks (imports done, window
+    built, first paint, login, first sync, ...) relative to the start, and
+    the time spent executing each imported module.
+
+    Disabled unless the app is started with FASTLINER_PROFILE_STARTUP=1 or
+    --profile-startup; marks are then no-ops.
+
+    Import times are 'self' times: a module's own execution without the
+    modules it imported, the same split as python -X importtime.
+    """
+    enabled = False
+    _start = None
+    _marks = []
+    _imports = {}
+    _stack = []
+    _hook = None
+    _finished = False
+
+    @classmethod
+    def requested(cls, argv=None) -> bool:
+        argv = sys.argv if argv is None else argv
+        value = os.environ.get(PROFILE_ENV, "")
+        return PROFILE_FLAG in argv or (value not in ("", "0"))
+
+    @classmethod
+    def start(cls):
+        """Starts profiling; call before the imports that should be timed."""
+        if cls.enabled:
+            return
+        cls.enabled = True
+        cls._start = time.perf_counter()
+        cls._marks = []
+        cls._imports = {}
+        cls._stack = []
+        cls._hook = _ImportTimer()
+        sys.meta_path.insert(0, cls._hook)
+
+    @classmethod
+    def stop_import_timing(cls):
+        if cls._hook in sys.meta_path:
+            sys.meta_path.remove(cls._hook)
+        cls._hook = None
+
+    @classmethod
+    def import_started(cls, name: str):
+        cls._stack.append([name, time.perf_counter(), 0.0])
+
+    @classmethod
+    def import_finished(cls, name: str):
+        name, started, children = cls._stack.pop()
+        total = time.perf_counter() - started
+        if cls._stack:
+            cls._stack[-1][2] += total
+        cls._imports[name] = (total - children, total)
+
+    @classmethod
+    def mark(cls, name: str):
+        """Records 'name' at the current time; later marks of a name are ignored."""
+        if not cls.enabled or any(mark == name for mark, _ in cls._marks):
+            return
+        cls._marks.append((name, time.perf_counter() - cls._start))
+
+    @classmethod
+    def watch_first_paint(cls, widget):
+        """Marks 'first_paint' when 'widget' is painted for the first time."""
+        if not cls.enabled:
+            return
+        from PySide6.QtCore import QObject, QEvent
+
+        class PaintWatcher(QObject):
+            def eventFilter(self, obj, event):
+                if event.type() == QEvent.Paint:
+                    cls.mark("first_paint")
+                    obj.removeEventFilter(self)
+                    self.deleteLater()
+                return False
+
+        widget.installEventFilter(PaintWatcher(widget))
+
+    @classmethod
+    def finish(cls):
+        """
+        Ends the startup phase (after the first sync): stops timing imports
+        and prints the report once.
+        """
+        if not cls.enabled or cls._finished:
+            return
+        cls._finished = True
+        cls.stop_import_timing()
+        print("\n".join(cls.report()))
+
+    @classmethod
+    def report(cls, top: int = 15) -> list:
+        """The report as lines of text."""
+        if not cls.enabled:
+            return [f"Startup profiling is off. Start with {PROFILE_FLAG} or {PROFILE_ENV}=1."]
+
+        lines = ["Startup timeline (ms since start, +delta):"]
+        previous = 0.0
+        for name, at in cls._marks:
+            lines.append(f"  {name:<14} {at * 1000:9.1f}  +{(at - previous) * 1000:.1f}")
+            previous = at
+
+        total_self = sum(self_time for self_time, _ in cls._imports.values())
+        lines.append(
+            f"Imports: {len(cls._imports)} modules, {total_self * 1000:.1f} ms; "
+            f"top {top} by self time (self / cumulative ms):"
+        )
+        slowest = sorted(cls._imports.items(), key=lambda item: item[1][0], reverse=True)[:top]
+        for name, (self_time, total) in slowest:
+            lines.append(f"  {self_time * 1000:8.1f} / {total * 1000:8.1f}  {name}")
+        return lines
@@ -0,0 +1,142 @@
+# UTILS/timeline_manager.py
+from collections import deque
+
+from UTILS.config_manager import ConfigManager
+
+class RoomTimeline:
+    """
+    Bounded buffer of the most recent events of one room, oldest first.
+
+    - prev_batch: token to paginate backwards from the oldest buffered event.
+      None when the start of the room was reached ('at_start') or when the
+      oldest events fell out of the buffer, after which the token has to be
+      anchored again at the oldest kept event.
+    - gap_end: set when a sync chunk was 'limited'; the server skipped the
+      events between this token and prev_batch. The events buffered before
+      the gap are kept in 'stale' (with their own prev_batch) until the gap
+      is filled.
+    """
+    __slots__ = ("events", "prev_batch", "gap_end", "stale", "at_start")
+
+    def __init__(self, size: int):
+        self.events = deque(maxlen=size)
+        self.prev_batch = None
+        self.gap_end = None
+        self.stale = None
+        self.at_start = False
+
+class TimelineManager:
+    _timelines = {}
+
+    @classmethod
+    def buffer_size(cls) -> int:
+        return max(1, int(ConfigManager.get("timeline_buffer_size", 200)))
+
+    @classmethod
+    def get(cls, room_id: str) -> RoomTimeline:
+        """Get the buffer of a room, creating an empty one if needed."""
+        timeline = cls._timelines.get(room_id)
+        if timeline is None:
+            timeline = RoomTimeline(cls.buffer_size())
+            cls._timelines[room_id] = timeline
+        return timeline
+
+    @classmethod
+    def has(cls, room_id: str) -> bool:
+        return room_id in cls._timelines
+
+    @classmethod
+    def events(cls, room_id: str) -> list:
+        """The buffered events of a room, oldest first."""
+        timeline = cls._timelines.get(room_id)
+        return list(timeline.events) if timeline else []
+
+    @classmethod
+    def seed(cls, room_id: str, events: list):
+        """Fills an empty buffer with events restored from disk."""
+        timeline = cls.get(room_id)
+        if not timeline.events:
+            timeline.events.extend(events)
+
+    @classmethod
+    def append_sync(cls, room_id: str, events: list, prev_batch: str, limited: bool, since: str):
+        """
+        Feeds a timeline chunk from a sync that was requested with 'since'.
+        """
+        timeline = cls.get(room_id)
+
+        if limited and timeline.events and since:
+            timeline.stale = (list(timeline.events), timeline.prev_batch)
+            timeline.events.clear()
+            timeline.gap_end = since
+            timeline.prev_batch = prev_batch
+            timeline.at_start = False
+        elif not timeline.events or limited:
+            timeline.prev_batch = prev_batch
+            timeline.at_start = False
+
+        overflow = len(timeline.events) + len(events) > timeline.events.maxlen
+        timeline.events.extend(events)
+        if overflow:
+            cls._drop_token(timeline)
+
+    @classmethod
+    def prepend(cls, room_id: str, events: list, prev_batch: str):
+        """
+        Inserts older events (oldest first) in front of the buffer. Because
+        the buffer is bounded, the newest events always win.
+        """
+        timeline = cls.get(room_id)
+        cls._replace(timeline, list(events) + list(timeline.events), prev_batch)
+
+    @classmethod
+    def close_gap(cls, room_id: str, events: list, prev_batch: str, complete: bool):
+        """
+        Inserts the events that were missing after a limited sync. If the
+        gap is now fully covered the stale events are reattached in front,
+        otherwise they are dropped and back-pagination continues from
+        'prev_batch'.
+        """
+        timeline = cls.get(room_id)
+        older = []
+        if complete and timeline.stale:
+            older, prev_batch = timeline.stale
+        timeline.stale = None
+        timeline.gap_end = None
+        cls._replace(timeline, older + list(events) + list(timeline.events), prev_batch)
+
+    @classmethod
+    def anchor(cls, room_id: str, prev_batch: str):
+        """Sets the token of a buffer whose oldest events were dropped."""
+        timeline = cls.get(room_id)
+        timeline.prev_batch = prev_batch
+        timeline.at_start = prev_batch is None
+
+    @classmethod
+    def _replace(cls, timeline: RoomTimeline, events: list, prev_batch: str):
+        """Makes 'events' the buffer; the newest events win if they do not all fit."""
+        maxlen = timeline.events.maxlen
+        timeline.events = deque(events, maxlen=maxlen)
+        timeline.prev_batch = prev_batch
+        timeline.at_start = prev_batch is None
+        if len(events) > maxlen:
+            cls._drop_token(timeline)
+
+    @staticmethod
+    def _drop_token(timeline: RoomTimeline):
+        # The token pointed before events that are no longer buffered;
+        # paging from it would skip the events in between.
+        timeline.prev_batch = None
+        timeline.at_start = False
+        if timeline.gap_end:
+            # A gap can only be filled from the token of its newer side.
+            timeline.stale = None
+            timeline.gap_end = None
+
+    @classmethod
+    def remove(cls, room_id: str):
+        cls._timelines.pop(room_id, None)
+
+    @classmethod
+    def clear(cls):
+        cls._timelines = {}
@@ -0,0 +1,182 @@
+# headless.py
+# Runs the Matrix client without Qt, for servers, bots and benchmarks:
+# output goes to stdout and commands are read from stdin.
+#
+#   python headless.py                  resume the saved session
+#   python headless.py --user alice     log in (password from FASTLINER_PASSWORD or a prompt)
+#   python headless.py --no-input       only sync and print, e.g. under a service manager
+
+import argparse
+import asyncio
+import getpass
+import os
+import sys
+
+from CORE.matrix_client import MatrixClient
+from UTILS.config_manager import ConfigManager
+from UTILS.event_formatter import EventFormatter
+from UTILS.open_room_manager import OpenRoomManager
+from UTILS.request_metrics import RequestMetrics
+from UTILS.loop_monitor import LoopMonitor
+
+HELP = """Commands:
+  /login <username> <password>
+  /logout
+  /whoami
+  /myrooms
+  /open <room_id>
+  /older
+  /leaveroom <room_id>
+  /stats [export [<path>]]
+  /looplag
+  /quit
+Any other text is sent to the open room."""
+
+
+class TerminalOutput:
+    """Prints the client's events as plain lines."""
+
+    def __init__(self, client: MatrixClient):
+        self.client = client
+        events = client.events
+        events.message.connect(self.print_line)
+        events.message_batch.connect(self.print_lines)
+        events.timeline.connect(self.print_timeline)
+        events.timeline_reset.connect(self.on_timeline_reset)
+        events.history.connect(self.on_history)
+        self.prev_batch = None
+
+    def print_line(self, text: str, role: str = None):
+        print(f"[{role or 'user'}] {text}", flush=True)
+
+    def print_lines(self, lines: list):
+        for text, role in lines:
+            self.print_line(text, role)
+
+    def print_timeline(self, room_id: str, events: list):
+        if room_id == OpenRoomManager.get_current_room():
+            self.print_lines(EventFormatter.format_events(events))
+
+    def on_timeline_reset(self, room_id: str, events: list, prev_batch):
+        if room_id == OpenRoomManager.get_current_room():
+            self.prev_batch = prev_batch
+            self.print_lines(EventFormatter.format_events(events))
+
+    def on_history(self, room_id: str, events: list, prev_batch):
+        if room_id == OpenRoomManager.get_current_room():
+            self.prev_batch = prev_batch
+            self.print_lines(EventFormatter.format_events(events))
+
+
+async def handle_line(client: MatrixClient, output: TerminalOutput, line: str) -> bool:
+    """Runs one input line; returns False when the runner should stop."""
+    parts = line.split()
+    if not parts:
+        return True
+
+    command, args = parts[0].lower(), parts[1:]
+    room_id = OpenRoomManager.get_current_room()
+
+    if not command.startswith("/"):
+        if room_id:
+            await client.send_message(room_id, line)
+        else:
+            output.print_line("No room open. Use /open <room_id>.", "warning")
+    elif command == "/quit":
+        return False
+    elif command == "/help":
+        output.print_line(HELP, "system")
+    elif command == "/login" and len(args) == 2:
+        await client.login(args[0], args[1])
+    elif command == "/logout":
+        await client.logout()
+    elif command == "/whoami":
+        await client.whoami()
+    elif command == "/myrooms":
+        await client.list_my_rooms()
+    elif command == "/open" and len(args) == 1:
+        OpenRoomManager.set_current_room(args[0])
+        await client.open_room(args[0])
+    elif command == "/older":
+        if room_id and output.prev_batch:
+            await client.load_older_messages(room_id, output.prev_batch)
+        else:
+            output.print_line("Nothing older to load.", "system")
+    elif command == "/leaveroom" and len(args) == 1:
+        await client.leave_room(args[0])
+    elif command == "/looplag":
+        output.print_lines([(line, "debug") for line in LoopMonitor.report()])
+    elif command == "/stats" and not args:
+        output.print_lines([(line, "debug") for line in RequestMetrics.report()])
+    elif command == "/stats" and args[0] == "export":
+        try:
+            path = RequestMetrics.export(args[1] if len(args) > 1 else None)
+            output.print_line(f"Request statistics written to {path}.", "success")
+        except OSError as e:
+            output.print_line(f"Could not write request statistics: {e}", "error")
+    else:
+        output.print_line(f"Unknown command or arguments: {line}", "warning")
+    return True
+
+
+async def read_lines():
+    """Yields lines from stdin without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    while True:
+        line = await reader.readline()
+        if not line:
+            return
+        yield line.decode().strip()
+
+
+async def run(args):
+    LoopMonitor.start(asyncio.get_running_loop())
+    client = MatrixClient()
+    output = TerminalOutput(client)
+
+    if args.homeserver:
+        client.homeserver = args.homeserver
+
+    if args.user:
+        password = os.environ.get("FASTLINER_PASSWORD") or getpass.getpass(f"Password for {args.user}: ")
+        logged_in = await client.login(args.user, password)
+    else:
+        logged_in = await client.restore_login()
+        if not logged_in:
+            output.print_line("No saved session. Use /login <username> <password> or --user.", "system")
+
+    try:
+        if args.no_input:
+            if not logged_in:
+                return 1
+            # Sync until interrupted.
+            await asyncio.Event().wait()
+        else:
+            async for line in read_lines():
+                if not await handle_line(client, output, line):
+                    break
+    finally:
+        if client.client:
+            await client.stop()
+        LoopMonitor.stop()
+        ConfigManager.flush()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fastliner without a GUI.")
+    parser.add_argument("--user", help="log in as this user instead of resuming the saved session")
+    parser.add_argument("--homeserver", help="homeserver URL (default: from config.json)")
+    parser.add_argument("--no-input", action="store_true", help="do not read commands from stdin")
+    args = parser.parse_args()
+
+    try:
+        sys.exit(asyncio.run(run(args)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
 # main.py
 
 import sys
+
+# Started before any other import so their cost can be measured.
+from UTILS.startup_profiler import StartupProfiler
+if StartupProfiler.requested():
+    StartupProfiler.start()
+
 import asyncio
 from PySide6.QtWidgets import QApplication
 from qasync import QEventLoop
@@ -9,8 +15,13 @@ from PySide6.QtGui import QFont, QIcon
 from UI.main_window import MainWindow
 from UTILS.signals import SignalManager
 from UTILS.config_manager import ConfigManager
+from UTILS.config_watcher import ConfigWatcher
+from UTILS.loop_monitor import LoopMonitor
 from CORE.command_handler import CommandHandler
 from CORE.matrix_client import MatrixClient
+from CORE.qt_bridge import bridge_client_events
+
+StartupProfiler.mark("imports")
 
 if __name__ == "__main__":
 
@@ -21,18 +32,31 @@ if __name__ == "__main__":
 
     try:
         config = ConfigManager.load_config()
-        font_name = ConfigManager.get("font", "SF Mono")
-        ui_scale = ConfigManager.get("ui_scale", 1.0)
-        font_scale = ConfigManager.get("font_scale", 14)
-        base_font_size = int(font_scale * ui_scale)
-        app.setFont(QFont(font_name, base_font_size))
+        StartupProfiler.mark("config")
+        LoopMonitor.start(loop)
+
+        def apply_font(*_):
+            font_name = ConfigManager.get("font", "SF Mono")
+            ui_scale = ConfigManager.get("ui_scale", 1.0)
+            font_scale = ConfigManager.get("font_scale", 14)
+            base_font_size = int(font_scale * ui_scale)
+            app.setFont(QFont(font_name, base_font_size))
+
+        apply_font()
+        for key in ("font", "ui_scale", "font_scale"):
+            ConfigManager.subscribe(key, apply_font)
+        config_watcher = ConfigWatcher()
         signals = SignalManager()
-        matrix_client = MatrixClient(signals)
+        matrix_client = MatrixClient()
+        bridge_client_events(matrix_client.events, signals)
         window = MainWindow(matrix_client=matrix_client)
+        StartupProfiler.mark("window")
+        StartupProfiler.watch_first_paint(window)
         window.show()
         cmd_handler = CommandHandler(main_window=window, matrix_client=matrix_client)
         signals.commandSignal.connect(cmd_handler.handle_command)
         signals.messageSignal.emit("Fastliner is ready.", "system")
+        asyncio.ensure_future(cmd_handler.restore_session())
 
         with loop:
             try:
@@ -42,6 +66,8 @@ if __name__ == "__main__":
                 loop.run_until_complete(matrix_client.stop())
             finally:
                 print("Shutting down...")
+                LoopMonitor.stop()
+                ConfigManager.flush()
                 loop.close()
 
     except Exception as e: